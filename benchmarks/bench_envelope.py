@@ -0,0 +1,89 @@
+"""Measure job envelope and API response serialization costs.
+
+Compares a JSON job payload carrying the same fields with the binary
+envelope, and stdlib ``json`` with ``orjson`` (used by the API's
+ORJSONResponse) on a page of runs. Run from the repository root:
+
+    python benchmarks/bench_envelope.py
+"""
+from __future__ import annotations
+
+import json
+import sys
+import timeit
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "shared" / "py"))
+
+from danux_shared.envelope import decode_job, encode_job
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - listed in services/api/requirements.txt
+    orjson = None
+
+
+def json_encode_job(run_id: str, created_at: datetime) -> bytes:
+    return json.dumps({"run_id": run_id, "created_at": created_at.isoformat()}).encode()
+
+
+def json_decode_job(raw: bytes) -> tuple[str, datetime]:
+    data = json.loads(raw)
+    return str(data["run_id"]), datetime.fromisoformat(data["created_at"])
+
+
+def make_run_page(size: int) -> dict[str, Any]:
+    now = datetime.now(timezone.utc)
+    return {
+        "items": [
+            {
+                "id": str(uuid.uuid4()),
+                "workflow_id": str(uuid.uuid4()),
+                "status": "succeeded",
+                "attempts": 1,
+                "last_error": None,
+                "created_at": (now - timedelta(seconds=index)).isoformat(),
+                "started_at": (now - timedelta(seconds=index)).isoformat(),
+                "finished_at": now.isoformat(),
+            }
+            for index in range(size)
+        ],
+        "next_cursor": "MjAyNi0wMy0wMVQxMjozMDowNSswMDowMHw",
+    }
+
+
+def per_call_us(func: Any, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main() -> None:
+    run_id, created_at = str(uuid.uuid4()), datetime.now(timezone.utc)
+    legacy, compact = json_encode_job(run_id, created_at), encode_job(run_id, created_at)
+    assert json_decode_job(legacy) == decode_job(compact)
+
+    print("job envelope          bytes  encode us  decode us")
+    for label, raw, encode, decode in (
+        ("json", legacy, json_encode_job, json_decode_job),
+        ("binary v1", compact, encode_job, decode_job),
+    ):
+        encode_us = per_call_us(lambda: encode(run_id, created_at), 100_000)
+        decode_us = per_call_us(lambda: decode(raw), 100_000)
+        print(f"{label:<20} {len(raw):>6} {encode_us:>10.2f} {decode_us:>10.2f}")
+
+    print()
+    print("run page (100 items)  bytes  serialize us")
+    page = make_run_page(100)
+    serializers = [("json", lambda: json.dumps(page).encode())]
+    if orjson is not None:
+        serializers.append(("orjson", lambda: orjson.dumps(page)))
+    else:
+        print("(orjson not installed; pip install -r services/api/requirements.txt)")
+    for label, serialize in serializers:
+        print(f"{label:<20} {len(serialize()):>6} {per_call_us(serialize, 2_000):>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
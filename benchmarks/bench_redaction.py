@@ -0,0 +1,80 @@
+"""Compare the compiled redaction engine against a naive deep-copy redactor.
+
+Run from the repository root:
+
+    python benchmarks/bench_redaction.py
+"""
+from __future__ import annotations
+
+import copy
+import re
+import sys
+import timeit
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "shared" / "py"))
+
+from danux_shared.redaction import REDACTED, SENSITIVE_KEY_WORDS, SENSITIVE_VALUE_PATTERNS, Redactor
+
+_NAIVE_VALUE_RES = [re.compile(pattern) for pattern in SENSITIVE_VALUE_PATTERNS]
+
+
+def naive_redact(value: Any) -> Any:
+    """Deep-copy the payload, then test every key and string one regex at a time."""
+    value = copy.deepcopy(value)
+
+    def walk(node: Any) -> Any:
+        if isinstance(node, dict):
+            for key in list(node):
+                if any(word in key.lower() for word in SENSITIVE_KEY_WORDS):
+                    node[key] = REDACTED
+                else:
+                    node[key] = walk(node[key])
+            return node
+        if isinstance(node, list):
+            return [walk(item) for item in node]
+        if isinstance(node, str):
+            for pattern in _NAIVE_VALUE_RES:
+                node = pattern.sub(REDACTED, node)
+            return node
+        return node
+
+    return walk(value)
+
+
+def make_event(items: int) -> dict[str, Any]:
+    """A webhook-shaped event: headers, a customer record and ``items`` line items."""
+    return {
+        "id": "evt_1NqXb2",
+        "type": "order.created",
+        "headers": {"content-type": "application/json", "user-agent": "shop/2.1", "x-api-key": "k_live_123"},
+        "customer": {"id": 42, "email": "ada@example.com", "name": "Ada", "session_id": "s_9"},
+        "callback_url": "https://hooks.example.com/ack?source=shop",
+        "items": [
+            {
+                "sku": f"SKU-{index:05d}",
+                "title": "Stainless steel bottle, 750 ml",
+                "qty": index % 4 + 1,
+                "price": {"amount": 1999, "currency": "EUR"},
+                "tags": ["kitchen", "outdoor"],
+            }
+            for index in range(items)
+        ],
+    }
+
+
+def main() -> None:
+    redactor = Redactor()
+    print(f"{'event':>10} {'naive us':>10} {'compiled us':>12} {'speedup':>8}")
+    for label, items in (("~1 KB", 4), ("~10 KB", 70), ("~100 KB", 700), ("~500 KB", 3500)):
+        event = make_event(items)
+        assert naive_redact(event) == redactor.redact(event)
+        number = max(1, 2000 // items)
+        naive = min(timeit.repeat(lambda: naive_redact(event), number=number, repeat=5)) / number
+        compiled = min(timeit.repeat(lambda: redactor.redact(event), number=number, repeat=5)) / number
+        print(f"{label:>10} {naive * 1e6:>10.1f} {compiled * 1e6:>12.1f} {naive / compiled:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
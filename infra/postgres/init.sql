@@ -1,3 +1,209 @@
--- Step 2 bootstrap SQL.
--- No application schema yet; schema introduced in Step 3.
-SELECT 'danux postgres init complete' AS message;
+-- Danux bootstrap schema.
+--
+-- runs, run_steps, run_logs, delivery_attempts, payload_blobs, run_payloads
+-- and run_idempotency_keys are range-partitioned by day. Old days are
+-- removed by dropping whole partitions, which is why rows in the child
+-- tables don't carry foreign keys to runs: a foreign key would pin the
+-- referenced partitions and force row-by-row deletes.
+
+-- A workflow either calls its own action_url or, when action_url is NULL,
+-- runs the DAG of actions in workflow_steps.
+CREATE TABLE IF NOT EXISTS workflows (
+    id              uuid        PRIMARY KEY DEFAULT gen_random_uuid(),
+    name            text        NOT NULL,
+    trigger_key     text        NOT NULL UNIQUE,
+    action_url      text,
+    action_method   text        NOT NULL DEFAULT 'POST',
+    action_headers  jsonb       NOT NULL DEFAULT '{}'::jsonb,
+    max_attempts    integer     NOT NULL DEFAULT 5 CHECK (max_attempts >= 1),
+    enabled         boolean     NOT NULL DEFAULT true,
+    created_at      timestamptz NOT NULL DEFAULT now(),
+    updated_at      timestamptz NOT NULL DEFAULT now()
+);
+
+-- A step runs once every step listed in depends_on has succeeded. Steps
+-- without dependencies receive the trigger payload; the others receive
+-- {"payload": ..., "steps": {<dependency>: <its JSON response>}}.
+CREATE TABLE IF NOT EXISTS workflow_steps (
+    workflow_id     uuid        NOT NULL REFERENCES workflows (id) ON DELETE CASCADE,
+    step_key        text        NOT NULL,
+    action_url      text        NOT NULL,
+    action_method   text        NOT NULL DEFAULT 'POST',
+    action_headers  jsonb       NOT NULL DEFAULT '{}'::jsonb,
+    depends_on      text[]      NOT NULL DEFAULT '{}',
+    PRIMARY KEY (workflow_id, step_key)
+);
+
+-- Per-event idempotency, the last line of defence behind the API's local
+-- filter and Redis. Unique constraints on a partitioned table must include
+-- the partition key, so a key is unique per day; the ingest statement also
+-- looks at the previous day, which covers at least the Redis TTL of 24h.
+-- Expired days are dropped with the runs partitions instead of deleted.
+CREATE TABLE IF NOT EXISTS run_idempotency_keys (
+    workflow_id     uuid        NOT NULL,
+    idempotency_key text        NOT NULL,
+    run_id          uuid        NOT NULL,
+    created_on      date        NOT NULL DEFAULT current_date,
+    created_at      timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (workflow_id, idempotency_key, created_on)
+) PARTITION BY RANGE (created_on);
+
+-- Run status lifecycle: queued -> running -> succeeded | failed, with
+-- retry_scheduled between attempts and dead_lettered once a workflow's
+-- max_attempts are exhausted on transient errors.
+CREATE TABLE IF NOT EXISTS runs (
+    id              uuid        NOT NULL DEFAULT gen_random_uuid(),
+    workflow_id     uuid        NOT NULL,
+    status          text        NOT NULL DEFAULT 'queued',
+    -- Digest of the run's snapshot in payload_blobs (same day as created_at).
+    payload_ref     bytea       NOT NULL,
+    attempts        integer     NOT NULL DEFAULT 0,
+    last_error      text,
+    next_attempt_at timestamptz,
+    created_at      timestamptz NOT NULL DEFAULT now(),
+    started_at      timestamptz,
+    finished_at     timestamptz,
+    updated_at      timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Keyset pagination walks (created_at, id) in descending order; every
+-- history filter combination gets an index in that order so a page is one
+-- index range scan per partition touched. Including status on the
+-- workflow index lets per-workflow status checks skip the heap.
+CREATE INDEX IF NOT EXISTS runs_created_at_id_idx ON runs (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS runs_workflow_created_at_idx ON runs (workflow_id, created_at DESC, id DESC) INCLUDE (status);
+CREATE INDEX IF NOT EXISTS runs_workflow_status_created_at_idx ON runs (workflow_id, status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS runs_status_created_at_idx ON runs (status, created_at DESC, id DESC);
+
+-- Per-step state of multi-step runs, keyed by the run's created_at so it
+-- lives and expires with the run. Steps that succeeded or failed for good
+-- are skipped when the run is retried or resumed after a worker crash;
+-- retry_scheduled steps and steps with no row yet are run again.
+CREATE TABLE IF NOT EXISTS run_steps (
+    run_id          uuid        NOT NULL,
+    created_at      timestamptz NOT NULL,
+    step_key        text        NOT NULL,
+    status          text        NOT NULL,
+    attempts        integer     NOT NULL DEFAULT 0,
+    status_code     integer,
+    last_error      text,
+    -- JSON response body, handed to the steps that depend on this one.
+    output          jsonb,
+    updated_at      timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (run_id, created_at, step_key)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE IF NOT EXISTS run_logs (
+    id              bigserial,
+    run_id          uuid        NOT NULL,
+    level           text        NOT NULL,
+    message         text        NOT NULL,
+    created_at      timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE INDEX IF NOT EXISTS run_logs_run_id_idx ON run_logs (run_id, created_at);
+
+CREATE TABLE IF NOT EXISTS delivery_attempts (
+    id              bigserial,
+    run_id          uuid        NOT NULL,
+    -- NULL for workflows with a single action.
+    step_key        text,
+    attempt         integer     NOT NULL,
+    status_code     integer,
+    duration_ms     integer     NOT NULL,
+    error           text,
+    created_at      timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE INDEX IF NOT EXISTS delivery_attempts_run_id_idx ON delivery_attempts (run_id, created_at);
+
+-- Redacted payload snapshots, addressed by the SHA-256 of their uncompressed
+-- bytes and stored out of line so run rows stay narrow. Deduplication is per
+-- day, which lets snapshots expire with the runs that reference them.
+CREATE TABLE IF NOT EXISTS payload_blobs (
+    digest          bytea       NOT NULL,
+    created_on      date        NOT NULL,
+    codec           text        NOT NULL,
+    size            integer     NOT NULL,
+    data            bytea       NOT NULL,
+    PRIMARY KEY (digest, created_on)
+) PARTITION BY RANGE (created_on);
+
+-- Request bodies exactly as received, which the worker delivers to the
+-- workflow's actions. They are not redacted, so data is encrypted with
+-- APP_ENCRYPTION_KEY (a version byte, a nonce and the AES-GCM ciphertext of
+-- the body, compressed first when codec is zstd) and stored per run.
+CREATE TABLE IF NOT EXISTS run_payloads (
+    run_id          uuid        NOT NULL,
+    created_at      timestamptz NOT NULL,
+    codec           text        NOT NULL,
+    data            bytea       NOT NULL,
+    PRIMARY KEY (run_id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Creates the daily partitions of every time-partitioned table from today
+-- through p_days_ahead days in the future. Safe to call concurrently.
+CREATE OR REPLACE FUNCTION danux_ensure_partitions(p_days_ahead integer DEFAULT 7)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    parent text;
+    part_day date;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('danux_partition_maintenance'));
+    FOREACH parent IN ARRAY ARRAY[
+        'runs', 'run_steps', 'run_logs', 'delivery_attempts', 'payload_blobs', 'run_payloads',
+        'run_idempotency_keys'
+    ] LOOP
+        FOR part_day IN
+            SELECT generate_series(current_date, current_date + p_days_ahead, interval '1 day')::date
+        LOOP
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                parent || '_p' || to_char(part_day, 'YYYYMMDD'),
+                parent,
+                part_day,
+                part_day + 1
+            );
+        END LOOP;
+    END LOOP;
+END;
+$$;
+
+-- Drops the daily partitions that end before current_date - p_retain_days.
+-- Dropping a partition is a catalog operation and leaves no dead tuples
+-- behind.
+CREATE OR REPLACE FUNCTION danux_drop_partitions(p_retain_days integer)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    cutoff date := current_date - p_retain_days;
+    part record;
+    dropped integer := 0;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('danux_partition_maintenance'));
+    FOR part IN
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class AS parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname IN (
+            'runs', 'run_steps', 'run_logs', 'delivery_attempts', 'payload_blobs', 'run_payloads',
+            'run_idempotency_keys'
+        )
+          AND child.relname ~ '_p[0-9]{8}$'
+          AND to_date(right(child.relname, 8), 'YYYYMMDD') < cutoff
+    LOOP
+        EXECUTE format('DROP TABLE IF EXISTS %I', part.relname);
+        dropped := dropped + 1;
+    END LOOP;
+    RETURN dropped;
+END;
+$$;
+
+SELECT danux_ensure_partitions();
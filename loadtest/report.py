@@ -0,0 +1,105 @@
+"""Latency summaries and the machine-readable load-test report."""
+from __future__ import annotations
+
+import math
+from collections import Counter
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+REPORT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class IngestSample:
+    seq: int
+    # Seconds from the scheduled send time to the API's response, so time
+    # spent queued behind slow requests counts against the API.
+    latency: float
+    status: int | None
+    # Set when no response arrived: connection error, timeout, ...
+    error: str | None = None
+
+
+def percentile(ordered: Sequence[float], q: float) -> float:
+    """Nearest-rank q-percentile (0 < q <= 100) of an ascending sequence."""
+    if not ordered:
+        return math.nan
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def latency_summary(seconds: Iterable[float]) -> dict[str, float | None]:
+    """p50/p95/p99/max and mean in milliseconds; None when there were no samples."""
+    ordered = sorted(seconds)
+    if not ordered:
+        return {"p50": None, "p95": None, "p99": None, "max": None, "mean": None}
+    summary = {f"p{q}": percentile(ordered, q) for q in (50, 95, 99)}
+    summary["max"] = ordered[-1]
+    summary["mean"] = sum(ordered) / len(ordered)
+    return {name: round(value * 1000, 3) for name, value in summary.items()}
+
+
+def _rate(count: int, seconds: float) -> float:
+    return round(count / seconds, 2) if seconds > 0 else 0.0
+
+
+def build_report(
+    config: Mapping[str, Any],
+    ingest: Sequence[IngestSample],
+    completions: Mapping[int, float],
+    *,
+    send_seconds: float,
+    total_seconds: float,
+) -> dict[str, Any]:
+    """Assemble the report from per-request samples and target receipts.
+
+    ``completions`` maps the seq of every event the fake target acknowledged
+    to its end-to-end latency in seconds. Events that were accepted but never
+    reached the target within the drain timeout are reported as missing.
+    """
+    statuses = Counter(sample.status for sample in ingest if sample.status is not None)
+    errors = Counter(sample.error for sample in ingest if sample.error is not None)
+    accepted = {sample.seq for sample in ingest if sample.status == 202}
+    completed = [latency for seq, latency in completions.items() if seq in accepted]
+    rejected = sum(count for status, count in statuses.items() if status not in (200, 202))
+    return {
+        "version": REPORT_VERSION,
+        "config": dict(config),
+        "ingest": {
+            "sent": len(ingest),
+            "accepted": len(accepted),
+            "duplicates": statuses.get(200, 0),
+            "rejected": rejected,
+            "status_counts": {str(status): count for status, count in sorted(statuses.items())},
+            "errors": sum(errors.values()),
+            "error_counts": dict(sorted(errors.items())),
+            "error_rate": round((rejected + sum(errors.values())) / len(ingest), 4) if ingest else 0.0,
+            "latency_ms": latency_summary(sample.latency for sample in ingest if sample.status is not None),
+            "duration_seconds": round(send_seconds, 3),
+            "throughput_rps": _rate(len(accepted), send_seconds),
+        },
+        "end_to_end": {
+            "completed": len(completed),
+            "missing": len(accepted) - len(completed),
+            "latency_ms": latency_summary(completed),
+            "duration_seconds": round(total_seconds, 3),
+            "throughput_rps": _rate(len(completed), total_seconds),
+        },
+    }
+
+
+def check_thresholds(report: Mapping[str, Any], *, max_error_rate: float, max_p99_ms: float) -> list[str]:
+    """Return one message per threshold the report breaks (0 disables a threshold)."""
+    failures: list[str] = []
+    ingest, end_to_end = report["ingest"], report["end_to_end"]
+    if max_error_rate and ingest["error_rate"] > max_error_rate:
+        failures.append(f"ingest error rate {ingest['error_rate']} above {max_error_rate}")
+    if max_p99_ms:
+        for name, section in (("ingest", ingest), ("end-to-end", end_to_end)):
+            p99 = section["latency_ms"]["p99"]
+            if p99 is not None and p99 > max_p99_ms:
+                failures.append(f"{name} p99 {p99} ms above {max_p99_ms} ms")
+    if end_to_end["missing"]:
+        failures.append(f"{end_to_end['missing']} accepted events never reached the target")
+    return failures
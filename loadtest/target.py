@@ -0,0 +1,146 @@
+"""A local stand-in for webhook destinations.
+
+It answers after a configurable latency, fails a configurable share of
+requests, and records when each load-test event was first delivered
+successfully. It can also run on its own:
+
+    python loadtest/target.py --port 9900 --latency-ms 50 --error-rate 0.05
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from aiohttp import web
+
+
+@dataclass
+class TargetStats:
+    requests: int = 0
+    injected_errors: int = 0
+    # Deliveries of an event the target had already acknowledged.
+    redeliveries: int = 0
+    unrecognised: int = 0
+
+
+class FakeTarget:
+    """Webhook destination with injected latency and failures.
+
+    Each response waits ``latency_ms`` plus a uniform ``jitter_ms``; a
+    ``error_rate`` share of requests then get ``error_status``, which the
+    worker retries like any failing destination. Events carry
+    ``{"loadtest": {"run": ..., "seq": ...}}`` in their payload; the first
+    successful delivery of each seq of the current run is timestamped.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: int | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.clock = clock
+        self.stats = TargetStats()
+        self.run_id: str | None = None
+        # seq -> wall-clock time of the first successful delivery.
+        self.received: dict[int, float] = {}
+        self._random = random.Random(seed)
+        self._changed = asyncio.Event()
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self._handle)
+        return app
+
+    async def wait_for(self, count: int, timeout: float) -> bool:
+        """Wait until ``count`` events were delivered; False on timeout."""
+        deadline = time.monotonic() + timeout
+        while len(self.received) < count:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.stats.requests += 1
+        body = await request.read()
+        delay = self.latency_ms + self._random.uniform(0, self.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.stats.injected_errors += 1
+            return web.json_response({"error": "injected"}, status=self.error_status)
+
+        seq = self._event_seq(body)
+        if seq is None:
+            self.stats.unrecognised += 1
+        elif seq in self.received:
+            self.stats.redeliveries += 1
+        else:
+            self.received[seq] = self.clock()
+            self._changed.set()
+        return web.json_response({"ok": True})
+
+    def _event_seq(self, body: bytes) -> int | None:
+        try:
+            marker = json.loads(body)["loadtest"]
+            if self.run_id is not None and marker["run"] != self.run_id:
+                return None
+            return int(marker["seq"])
+        except (ValueError, TypeError, KeyError):
+            return None
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    target = FakeTarget(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+    )
+    runner = web.AppRunner(target.app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, args.host, args.port).start()
+    print(f"fake target listening on http://{args.host}:{args.port}/", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9900)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--seed", type=int)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
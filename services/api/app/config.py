@@ -0,0 +1,79 @@
+from functools import lru_cache
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    database_url: str
+    redis_url: str
+    # Encrypts the request bodies kept for delivery (run_payloads).
+    app_encryption_key: str
+    log_level: str = "INFO"
+
+    queue_stream: str = "danux:runs"
+    queue_group: str = "workers"
+    queue_maxlen: int = 1_000_000
+
+    # Ingest is refused with 429 once the queue backlog or the age of the
+    # oldest undelivered job passes its limit (0 disables a limit), until
+    # both are back under resume_ratio of their limits.
+    admission_max_queue_depth: int = 100_000
+    admission_max_lag_seconds: float = 120.0
+    admission_resume_ratio: float = 0.8
+    admission_sample_interval_seconds: float = 1.0
+    admission_retry_after_seconds: int = 10
+    # Per-trigger ingest limits in events per second, e.g. {"github-push": 20};
+    # 0 pauses a trigger.
+    trigger_quotas: dict[str, float] = {}
+
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 10.0
+    # Redis connections opened at startup, before traffic is accepted.
+    redis_warm_connections: int = 10
+
+    # Startup opens db_pool_size database connections, redis_warm_connections
+    # Redis connections and caches up to trigger_cache_prime_size triggers
+    # before /ready passes; a warm-up that fails or times out is logged and
+    # /ready then follows the dependency probes alone.
+    warmup_timeout_seconds: float = 15.0
+    trigger_cache_prime_size: int = 10_000
+    readiness_probe_interval_seconds: float = 2.0
+    readiness_probe_timeout_seconds: float = 1.0
+    # A probe result older than this no longer counts as passing.
+    readiness_stale_seconds: float = 10.0
+
+    # Keys stay in Redis for the TTL and in the local filter for one to two
+    # windows; keep the window at most half the TTL so a local "maybe" is
+    # always backed by a Redis record.
+    idempotency_ttl_seconds: int = 86_400
+    idempotency_filter_capacity: int = 1_000_000
+    idempotency_filter_error_rate: float = 0.01
+    idempotency_filter_window_seconds: float = 3_600.0
+
+    trigger_cache_size: int = 50_000
+    trigger_cache_ttl_seconds: float = 300.0
+    trigger_cache_negative_ttl_seconds: float = 30.0
+    trigger_invalidation_channel: str = "danux:triggers:invalidate"
+
+    runs_export_batch_size: int = 1_000
+
+    # Daily partitions kept created ahead, as the workers do.
+    partition_days_ahead: int = 7
+    partition_maintenance_interval_seconds: float = 3_600.0
+
+    max_payload_bytes: int = 1_048_576
+    payload_compress_min_bytes: int = 1_024
+    # Bodies at least this large are redacted and compressed in the thread
+    # pool rather than on the event loop.
+    payload_offload_min_bytes: int = 65_536
+    # Added to the built-in redaction key words and value regexes.
+    redaction_extra_keys: list[str] = []
+    redaction_extra_patterns: list[str] = []
+
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
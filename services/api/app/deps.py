@@ -0,0 +1,52 @@
+import redis.asyncio as redis
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import Settings
+from app.instrumentation import ApiMetrics
+from app.services.admission import AdmissionController
+from app.services.idempotency import IdempotencyGuard
+from app.services.readiness import Readiness
+from app.services.triggers import TriggerResolver
+from danux_shared.cipher import PayloadCipher
+from danux_shared.redaction import Redactor
+
+
+def get_settings(request: Request) -> Settings:
+    return request.app.state.settings
+
+
+def get_engine(request: Request) -> AsyncEngine:
+    return request.app.state.engine
+
+
+def get_redis(request: Request) -> redis.Redis:
+    return request.app.state.redis
+
+
+def get_idempotency(request: Request) -> IdempotencyGuard:
+    return request.app.state.idempotency
+
+
+def get_trigger_resolver(request: Request) -> TriggerResolver:
+    return request.app.state.triggers
+
+
+def get_redactor(request: Request) -> Redactor:
+    return request.app.state.redactor
+
+
+def get_payload_cipher(request: Request) -> PayloadCipher:
+    return request.app.state.cipher
+
+
+def get_admission(request: Request) -> AdmissionController:
+    return request.app.state.admission
+
+
+def get_metrics(request: Request) -> ApiMetrics:
+    return request.app.state.metrics
+
+
+def get_readiness(request: Request) -> Readiness:
+    return request.app.state.readiness
@@ -0,0 +1,104 @@
+import time
+from collections.abc import Callable
+from typing import Any
+
+import redis.asyncio as redis
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.admission import AdmissionController
+from app.services.readiness import Readiness
+from danux_shared.metrics import Gauge, Registry
+
+
+def _watch_db_pool(gauge: Gauge, engine: AsyncEngine) -> Callable[[], None]:
+    def collect() -> None:
+        pool: Any = engine.pool
+        gauge.set(pool.checkedout(), "in_use")
+        gauge.set(pool.checkedin(), "idle")
+        gauge.set(max(0, pool.overflow()), "overflow")
+        gauge.set(pool.size(), "size")
+
+    return collect
+
+
+def _watch_redis_pool(gauge: Gauge, client: redis.Redis) -> Callable[[], None]:
+    def collect() -> None:
+        pool: Any = client.connection_pool
+        gauge.set(len(pool._in_use_connections), "in_use")
+        gauge.set(len(pool._available_connections), "idle")
+
+    return collect
+
+
+class ApiMetrics:
+    def __init__(self) -> None:
+        self.registry = registry = Registry()
+        self.requests = registry.histogram(
+            "danux_http_request_duration_seconds",
+            "HTTP request latency by route template and status code.",
+            ("method", "route", "status"),
+        )
+        self.ingested = registry.counter(
+            "danux_ingest_total", "Webhook deliveries received, by outcome.", ("outcome",)
+        )
+        self.enqueue = registry.histogram(
+            "danux_enqueue_duration_seconds", "Redis round trip that records and enqueues an accepted run."
+        )
+        self.queue_depth = registry.gauge(
+            "danux_queue_depth", "Runs waiting in the queue or delivered but not acknowledged."
+        )
+        self.queue_lag = registry.gauge("danux_queue_lag_seconds", "Age of the oldest run no worker has picked up.")
+        self.shedding = registry.gauge("danux_admission_shedding", "1 while ingest is refused for queue backlog.")
+        self.ready = registry.gauge("danux_ready", "1 while /ready passes.")
+        self.db_pool = registry.gauge("danux_db_pool_connections", "Database pool connections by state.", ("state",))
+        self.redis_pool = registry.gauge(
+            "danux_redis_pool_connections", "Redis pool connections by state.", ("state",)
+        )
+
+    def watch(
+        self, engine: AsyncEngine, client: redis.Redis, admission: AdmissionController, readiness: Readiness
+    ) -> None:
+        self.registry.on_collect(_watch_db_pool(self.db_pool, engine))
+        self.registry.on_collect(_watch_redis_pool(self.redis_pool, client))
+
+        def collect_admission() -> None:
+            if admission.sample is not None:
+                self.queue_depth.set(admission.sample.depth)
+                self.queue_lag.set(admission.sample.lag_seconds)
+            self.shedding.set(float(admission.shedding))
+
+        self.registry.on_collect(collect_admission)
+        self.registry.on_collect(lambda: self.ready.set(float(readiness.ready)))
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request.
+
+    Requests are labelled with their route template rather than the raw
+    path, so probes for random URLs can't create unbounded label sets.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: ApiMetrics) -> None:
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", "unmatched")
+            self.metrics.requests.observe(time.perf_counter() - started, scope["method"], route, str(status_code))
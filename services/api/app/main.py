@@ -1,8 +1,163 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
 
-app = FastAPI(title="Danux API", version="0.1.0")
+import redis.asyncio as redis
+from fastapi import Depends, FastAPI, status
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 
+from app.config import Settings, get_settings
+from app.db import create_engine
+from app.deps import get_metrics, get_readiness
+from app.instrumentation import ApiMetrics, MetricsMiddleware
+from app.routes import runs, system, webhooks, workflows
+from app.services.admission import AdmissionController
+from app.services.bloom import TimeWindowedBloomFilter
+from app.services.cache import TTLCache
+from app.services.idempotency import IdempotencyGuard
+from app.services.partitions import ensure_partitions
+from app.services.queue import run_sampler
+from app.services.readiness import Readiness, run_probes
+from app.services.triggers import TriggerResolver, listen_for_invalidations
+from app.services.warmup import database_probe, redis_probe, warm_engine, warm_redis
+from danux_shared.cipher import PayloadCipher
+from danux_shared.redaction import (
+    SENSITIVE_KEY_WORDS,
+    SENSITIVE_VALUE_PATTERNS,
+    Redactor,
+    install_log_redaction,
+)
 
+logger = logging.getLogger(__name__)
+
+metrics = ApiMetrics()
+
+
+async def _warm_up(app: FastAPI, settings: Settings, subscribed: asyncio.Event) -> None:
+    """Fill the connection pools and the trigger cache before taking traffic."""
+    started = asyncio.get_running_loop().time()
+    await asyncio.gather(
+        warm_engine(app.state.engine, settings.db_pool_size),
+        warm_redis(app.state.redis, settings.redis_warm_connections),
+    )
+    # Priming before the invalidation listener subscribes would be undone by
+    # the cache flush it does on subscribing.
+    await subscribed.wait()
+    primed = await app.state.triggers.prime(settings.trigger_cache_prime_size)
+    logger.info(
+        "startup warm-up done",
+        extra={"triggers": primed, "seconds": round(asyncio.get_running_loop().time() - started, 3)},
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    settings = get_settings()
+    app.state.settings = settings
+    app.state.redactor = Redactor(
+        key_words=[*SENSITIVE_KEY_WORDS, *settings.redaction_extra_keys],
+        value_patterns=[*SENSITIVE_VALUE_PATTERNS, *settings.redaction_extra_patterns],
+    )
+    install_log_redaction(
+        app.state.redactor, settings.log_level, logger_names=("uvicorn", "uvicorn.error", "uvicorn.access")
+    )
+    app.state.cipher = PayloadCipher(settings.app_encryption_key)
+    app.state.engine = create_engine(settings)
+    app.state.redis = redis.from_url(settings.redis_url)
+    app.state.idempotency = IdempotencyGuard(
+        app.state.redis,
+        TimeWindowedBloomFilter(
+            capacity=settings.idempotency_filter_capacity,
+            error_rate=settings.idempotency_filter_error_rate,
+            window_seconds=settings.idempotency_filter_window_seconds,
+        ),
+        ttl_seconds=settings.idempotency_ttl_seconds,
+    )
+    app.state.triggers = TriggerResolver(
+        app.state.engine,
+        TTLCache(
+            maxsize=settings.trigger_cache_size,
+            ttl_seconds=settings.trigger_cache_ttl_seconds,
+            negative_ttl_seconds=settings.trigger_cache_negative_ttl_seconds,
+        ),
+    )
+    app.state.admission = AdmissionController(
+        max_queue_depth=settings.admission_max_queue_depth,
+        max_lag_seconds=settings.admission_max_lag_seconds,
+        resume_ratio=settings.admission_resume_ratio,
+        retry_after_seconds=settings.admission_retry_after_seconds,
+        trigger_quotas=settings.trigger_quotas,
+    )
+    app.state.readiness = Readiness(
+        {"database": database_probe(app.state.engine), "redis": redis_probe(app.state.redis)},
+        timeout_seconds=settings.readiness_probe_timeout_seconds,
+        stale_after_seconds=settings.readiness_stale_seconds,
+    )
+    app.state.metrics = metrics
+    metrics.watch(app.state.engine, app.state.redis, app.state.admission, app.state.readiness)
+    subscribed = asyncio.Event()
+    background = [
+        asyncio.create_task(
+            listen_for_invalidations(
+                app.state.redis, settings.trigger_invalidation_channel, app.state.triggers, subscribed
+            ),
+            name="trigger-invalidations",
+        ),
+        asyncio.create_task(run_sampler(app.state.redis, settings, app.state.admission), name="queue-sampler"),
+        asyncio.create_task(
+            ensure_partitions(
+                app.state.engine, settings.partition_days_ahead, settings.partition_maintenance_interval_seconds
+            ),
+            name="partition-maintenance",
+        ),
+    ]
+    try:
+        try:
+            await asyncio.wait_for(_warm_up(app, settings, subscribed), timeout=settings.warmup_timeout_seconds)
+        except Exception:
+            # Start anyway: /ready stays failing until the probes pass, and
+            # restarting here would only hammer a dependency that is down.
+            logger.exception("startup warm-up failed")
+        await app.state.readiness.probe_once()
+        app.state.readiness.warmed_up = True
+        background.append(
+            asyncio.create_task(
+                run_probes(app.state.readiness, settings.readiness_probe_interval_seconds), name="readiness-probes"
+            )
+        )
+        yield
+    finally:
+        for task in background:
+            task.cancel()
+        for task in background:
+            with suppress(asyncio.CancelledError):
+                await task
+        await app.state.redis.aclose()
+        await app.state.engine.dispose()
+
+
+app = FastAPI(title="Danux API", version="0.1.0", lifespan=lifespan, default_response_class=ORJSONResponse)
+app.add_middleware(MetricsMiddleware, metrics=metrics)
+app.include_router(webhooks.router)
+app.include_router(workflows.router)
+app.include_router(runs.router)
+app.include_router(system.router)
+
+
+# Liveness: the process is up. Whether it should get traffic is /ready.
 @app.get("/health", tags=["system"])
 def healthcheck() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@app.get("/ready", tags=["system"])
+def readiness_check(readiness: Readiness = Depends(get_readiness)) -> ORJSONResponse:
+    code = status.HTTP_200_OK if readiness.ready else status.HTTP_503_SERVICE_UNAVAILABLE
+    return ORJSONResponse(readiness.as_dict(), status_code=code)
+
+
+# Async so rendering runs on the event loop thread that updates the metrics.
+@app.get("/metrics", tags=["system"], response_class=PlainTextResponse)
+async def prometheus_metrics(api_metrics: ApiMetrics = Depends(get_metrics)) -> PlainTextResponse:
+    return PlainTextResponse(api_metrics.registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,131 @@
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import Settings
+from app.deps import get_engine, get_settings
+from app.schemas import RunOut, RunPage
+from app.services.pagination import Cursor, decode_cursor, encode_cursor
+
+router = APIRouter(prefix="/v1/runs", tags=["runs"])
+
+# Payload snapshots are deliberately not part of listings or exports.
+_RUN_COLUMNS = "id, workflow_id, status, attempts, last_error, created_at, started_at, finished_at"
+
+
+@router.get("", response_model=RunPage)
+async def list_runs(
+    workflow_id: UUID | None = None,
+    run_status: str | None = Query(default=None, alias="status"),
+    created_after: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    engine: AsyncEngine = Depends(get_engine),
+) -> RunPage:
+    """Newest-first run history with keyset pagination.
+
+    Each page seeks straight to its position in the (created_at, id) index
+    instead of skipping OFFSET rows, so deep pages cost the same as the
+    first one. ``created_after`` bounds the partitions that are scanned.
+    """
+    clauses, params = _filters(workflow_id, run_status, created_after, None)
+    if cursor is not None:
+        try:
+            position = decode_cursor(cursor)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid_cursor") from exc
+        # The plain created_at bound lets the planner prune newer partitions;
+        # the row comparison breaks ties between runs created in the same
+        # microsecond.
+        clauses.append("created_at <= :cursor_created_at")
+        clauses.append("(created_at, id) < (:cursor_created_at, :cursor_id)")
+        params.update(cursor_created_at=position.created_at, cursor_id=position.id)
+
+    statement = text(
+        f"SELECT {_RUN_COLUMNS} FROM runs {_where(clauses)} ORDER BY created_at DESC, id DESC LIMIT :limit"
+    )
+    async with engine.connect() as conn:
+        rows = (await conn.execute(statement, {**params, "limit": limit + 1})).mappings().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(Cursor(created_at=rows[-1]["created_at"], id=rows[-1]["id"]))
+    return RunPage(items=[RunOut(**_serialize(row)) for row in rows], next_cursor=next_cursor)
+
+
+@router.get("/export")
+async def export_runs(
+    workflow_id: UUID | None = None,
+    run_status: str | None = Query(default=None, alias="status"),
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    settings: Settings = Depends(get_settings),
+    engine: AsyncEngine = Depends(get_engine),
+) -> StreamingResponse:
+    """Stream matching runs oldest-first as newline-delimited JSON.
+
+    Rows are pulled through a server-side cursor in fixed-size batches, so
+    memory use does not depend on the size of the export.
+    """
+    clauses, params = _filters(workflow_id, run_status, created_after, created_before)
+    statement = text(f"SELECT {_RUN_COLUMNS} FROM runs {_where(clauses)} ORDER BY created_at, id")
+
+    async def lines() -> AsyncIterator[bytes]:
+        async with engine.connect() as conn:
+            result = await conn.stream(
+                statement, params, execution_options={"yield_per": settings.runs_export_batch_size}
+            )
+            async for batch in result.mappings().partitions():
+                yield b"".join(orjson.dumps(_serialize(row)) + b"\n" for row in batch)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def _filters(
+    workflow_id: UUID | None,
+    run_status: str | None,
+    created_after: datetime | None,
+    created_before: datetime | None,
+) -> tuple[list[str], dict[str, Any]]:
+    # Only the filters actually given end up in the SQL, so each combination
+    # gets a plan that matches one of the runs indexes.
+    clauses: list[str] = []
+    params: dict[str, Any] = {}
+    if workflow_id is not None:
+        clauses.append("workflow_id = :workflow_id")
+        params["workflow_id"] = workflow_id
+    if run_status is not None:
+        clauses.append("status = :status")
+        params["status"] = run_status
+    if created_after is not None:
+        clauses.append("created_at >= :created_after")
+        params["created_after"] = created_after
+    if created_before is not None:
+        clauses.append("created_at < :created_before")
+        params["created_before"] = created_before
+    return clauses, params
+
+
+def _where(clauses: list[str]) -> str:
+    return f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+
+def _serialize(row: Any) -> dict[str, Any]:
+    return {
+        "id": str(row["id"]),
+        "workflow_id": str(row["workflow_id"]),
+        "status": row["status"],
+        "attempts": row["attempts"],
+        "last_error": row["last_error"],
+        "created_at": row["created_at"].isoformat(),
+        "started_at": row["started_at"].isoformat() if row["started_at"] else None,
+        "finished_at": row["finished_at"].isoformat() if row["finished_at"] else None,
+    }
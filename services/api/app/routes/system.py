@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends
+
+from app.deps import get_admission, get_idempotency
+from app.services.admission import AdmissionController
+from app.services.idempotency import IdempotencyGuard
+
+router = APIRouter(prefix="/v1/system", tags=["system"])
+
+
+@router.get("/idempotency")
+def idempotency_stats(idempotency: IdempotencyGuard = Depends(get_idempotency)) -> dict[str, float]:
+    return idempotency.stats.as_dict()
+
+
+@router.get("/admission")
+def admission_stats(admission: AdmissionController = Depends(get_admission)) -> dict[str, float]:
+    return admission.as_dict()
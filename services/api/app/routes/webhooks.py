@@ -0,0 +1,161 @@
+import json
+import logging
+import time
+
+import redis.asyncio as redis
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from redis.exceptions import RedisError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import Settings
+from app.deps import (
+    get_admission,
+    get_engine,
+    get_idempotency,
+    get_metrics,
+    get_payload_cipher,
+    get_redactor,
+    get_redis,
+    get_settings,
+    get_trigger_resolver,
+)
+from app.instrumentation import ApiMetrics
+from app.schemas import IngestResponse
+from app.services.admission import AdmissionController
+from app.services.idempotency import IdempotencyGuard, build_idempotency_key
+from app.services.payloads import build_payloads, read_body
+from app.services.queue import enqueue_run
+from app.services.triggers import TriggerResolver
+from danux_shared.cipher import PayloadCipher
+from danux_shared.redaction import Redactor
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/v1/webhooks", tags=["webhooks"])
+
+# Claiming the idempotency key, storing the delivery payload and the
+# redacted snapshot and creating the run share one statement, so a duplicate
+# event costs a single round trip and never creates a run row. Snapshots are
+# content-addressed per day: the same payload arriving twice on one day is
+# stored once. Keys are unique per day, so the previous day is checked as
+# well.
+_CREATE_RUN = text(
+    """
+    WITH claim AS (
+        INSERT INTO run_idempotency_keys (workflow_id, idempotency_key, run_id)
+        SELECT CAST(:workflow_id AS uuid), :idempotency_key, gen_random_uuid()
+        WHERE NOT EXISTS (
+            SELECT 1 FROM run_idempotency_keys
+            WHERE workflow_id = CAST(:workflow_id AS uuid)
+              AND idempotency_key = :idempotency_key
+              AND created_on = current_date - 1
+        )
+        ON CONFLICT (workflow_id, idempotency_key, created_on) DO NOTHING
+        RETURNING workflow_id, run_id, created_at
+    ),
+    delivery AS (
+        INSERT INTO run_payloads (run_id, created_at, codec, data)
+        SELECT run_id, created_at, :delivery_codec, :delivery_data FROM claim
+    ),
+    blob AS (
+        INSERT INTO payload_blobs (digest, created_on, codec, size, data)
+        SELECT :digest, created_at::date, :codec, :size, :data FROM claim
+        ON CONFLICT (digest, created_on) DO NOTHING
+    )
+    INSERT INTO runs (id, workflow_id, created_at, payload_ref)
+    SELECT run_id, workflow_id, created_at, :digest FROM claim
+    RETURNING id, created_at
+    """
+)
+
+
+@router.post("/{trigger_key}", response_model=IngestResponse, status_code=status.HTTP_202_ACCEPTED)
+async def ingest(
+    trigger_key: str,
+    request: Request,
+    response: Response,
+    settings: Settings = Depends(get_settings),
+    engine: AsyncEngine = Depends(get_engine),
+    client: redis.Redis = Depends(get_redis),
+    idempotency: IdempotencyGuard = Depends(get_idempotency),
+    triggers: TriggerResolver = Depends(get_trigger_resolver),
+    redactor: Redactor = Depends(get_redactor),
+    cipher: PayloadCipher = Depends(get_payload_cipher),
+    admission: AdmissionController = Depends(get_admission),
+    metrics: ApiMetrics = Depends(get_metrics),
+) -> IngestResponse:
+    # Checked before the body is read so shed requests cost next to nothing.
+    retry_after = admission.admit(trigger_key)
+    if retry_after is not None:
+        metrics.ingested.inc("shed")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="overloaded",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    body = await read_body(request, settings.max_payload_bytes)
+    try:
+        payload = json.loads(body) if body else None
+    except json.JSONDecodeError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid_json") from exc
+
+    trigger = await triggers.resolve(trigger_key)
+    if trigger is None:
+        metrics.ingested.inc("unknown_trigger")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="unknown_trigger")
+
+    event_id = request.headers.get("idempotency-key") or request.headers.get("x-event-id")
+    key = build_idempotency_key(trigger.workflow_id, event_id, body)
+    if await idempotency.is_duplicate(key):
+        metrics.ingested.inc("duplicate")
+        response.status_code = status.HTTP_200_OK
+        return IngestResponse(status="duplicate")
+
+    snapshot, delivery = await build_payloads(
+        payload,
+        body,
+        redactor,
+        cipher,
+        compress_min_bytes=settings.payload_compress_min_bytes,
+        offload_min_bytes=settings.payload_offload_min_bytes,
+    )
+    async with engine.begin() as conn:
+        run = (
+            await conn.execute(
+                _CREATE_RUN,
+                {
+                    "workflow_id": trigger.workflow_id,
+                    "idempotency_key": key,
+                    "digest": snapshot.digest,
+                    "codec": snapshot.codec,
+                    "size": snapshot.size,
+                    "data": snapshot.data,
+                    "delivery_codec": delivery.codec,
+                    "delivery_data": delivery.data,
+                },
+            )
+        ).first()
+    if run is None:
+        idempotency.record_db_duplicate(key)
+        metrics.ingested.inc("duplicate")
+        response.status_code = status.HTTP_200_OK
+        return IngestResponse(status="duplicate")
+
+    started = time.perf_counter()
+    try:
+        # One MULTI/EXEC, so the key is never recorded without the entry.
+        async with client.pipeline(transaction=True) as pipe:
+            idempotency.remember(pipe, key)
+            enqueue_run(pipe, settings, str(run.id), run.created_at)
+            await pipe.execute()
+    except RedisError:
+        # The run is committed; the worker's stranded-run sweep enqueues it.
+        logger.exception("enqueue failed, run left for the stranded-run sweep", extra={"run_id": str(run.id)})
+        metrics.ingested.inc("enqueue_failed")
+        return IngestResponse(status="queued", run_id=str(run.id))
+    idempotency.remembered(key)
+    metrics.enqueue.observe(time.perf_counter() - started)
+    metrics.ingested.inc("queued")
+    return IngestResponse(status="queued", run_id=str(run.id))
@@ -0,0 +1,176 @@
+import json
+from typing import Any
+from uuid import UUID
+
+import redis.asyncio as redis
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.config import Settings
+from app.deps import get_engine, get_redis, get_settings
+from app.schemas import WorkflowCreate, WorkflowOut, WorkflowStep, WorkflowStepOut, WorkflowUpdate
+from app.services.triggers import publish_invalidation
+
+router = APIRouter(prefix="/v1/workflows", tags=["workflows"])
+
+_COLUMNS = (
+    "id, name, trigger_key, action_url, action_method, action_headers, max_attempts, enabled, created_at, updated_at"
+)
+
+_INSERT_WORKFLOW = text(
+    f"""
+    INSERT INTO workflows (name, trigger_key, action_url, action_method, action_headers, max_attempts, enabled)
+    VALUES (
+        :name, :trigger_key, :action_url, :action_method, CAST(:action_headers AS jsonb), :max_attempts, :enabled
+    )
+    RETURNING {_COLUMNS}
+    """
+)
+
+_SELECT_WORKFLOW = text(f"SELECT {_COLUMNS} FROM workflows WHERE id = :id")
+
+_LOCK_WORKFLOW = text("SELECT trigger_key FROM workflows WHERE id = :id FOR UPDATE")
+
+_SELECT_STEPS = text(
+    """
+    SELECT step_key, action_url, action_method, action_headers, depends_on
+    FROM workflow_steps
+    WHERE workflow_id = :workflow_id
+    ORDER BY step_key
+    """
+)
+
+_INSERT_STEP = text(
+    """
+    INSERT INTO workflow_steps (workflow_id, step_key, action_url, action_method, action_headers, depends_on)
+    VALUES (
+        :workflow_id, :step_key, :action_url, :action_method, CAST(:action_headers AS jsonb), :depends_on
+    )
+    """
+)
+
+_DELETE_STEPS = text("DELETE FROM workflow_steps WHERE workflow_id = :workflow_id")
+
+
+@router.post("", response_model=WorkflowOut, status_code=status.HTTP_201_CREATED)
+async def create_workflow(
+    body: WorkflowCreate,
+    settings: Settings = Depends(get_settings),
+    engine: AsyncEngine = Depends(get_engine),
+    client: redis.Redis = Depends(get_redis),
+) -> WorkflowOut:
+    try:
+        async with engine.begin() as conn:
+            row = (
+                await conn.execute(_INSERT_WORKFLOW, _to_params(body.model_dump(exclude={"steps"})))
+            ).mappings().one()
+            steps = await _replace_steps(conn, row["id"], body.steps) if body.steps else []
+    except IntegrityError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="trigger_key_taken") from exc
+    # Drops any negative cache entry other processes hold for this key.
+    await publish_invalidation(client, settings.trigger_invalidation_channel, body.trigger_key)
+    return _to_out(row, steps)
+
+
+@router.get("/{workflow_id}", response_model=WorkflowOut)
+async def get_workflow(workflow_id: UUID, engine: AsyncEngine = Depends(get_engine)) -> WorkflowOut:
+    async with engine.connect() as conn:
+        row = (await conn.execute(_SELECT_WORKFLOW, {"id": workflow_id})).mappings().first()
+        if row is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="workflow_not_found")
+        steps = (await conn.execute(_SELECT_STEPS, {"workflow_id": workflow_id})).mappings().all()
+    return _to_out(row, steps)
+
+
+@router.patch("/{workflow_id}", response_model=WorkflowOut)
+async def update_workflow(
+    workflow_id: UUID,
+    body: WorkflowUpdate,
+    settings: Settings = Depends(get_settings),
+    engine: AsyncEngine = Depends(get_engine),
+    client: redis.Redis = Depends(get_redis),
+) -> WorkflowOut:
+    changes = _to_params(body.model_dump(exclude_unset=True, exclude_none=True, exclude={"steps"}))
+    if body.steps is not None:
+        # Multi-step workflows have no action of their own.
+        changes["action_url"] = None
+    assignments = ", ".join(
+        f"{column} = CAST(:{column} AS jsonb)" if column == "action_headers" else f"{column} = :{column}"
+        for column in changes
+    )
+    try:
+        async with engine.begin() as conn:
+            previous_key = (await conn.execute(_LOCK_WORKFLOW, {"id": workflow_id})).scalar()
+            if previous_key is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="workflow_not_found")
+            statement = text(
+                f"UPDATE workflows SET {assignments + ', ' if assignments else ''}updated_at = now() "
+                f"WHERE id = :id RETURNING {_COLUMNS}"
+            )
+            row = (await conn.execute(statement, {**changes, "id": workflow_id})).mappings().one()
+            if body.steps is not None:
+                steps = await _replace_steps(conn, workflow_id, body.steps)
+            elif body.action_url is not None:
+                await conn.execute(_DELETE_STEPS, {"workflow_id": workflow_id})
+                steps = []
+            else:
+                steps = (await conn.execute(_SELECT_STEPS, {"workflow_id": workflow_id})).mappings().all()
+    except IntegrityError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="trigger_key_taken") from exc
+
+    keys = {previous_key, row["trigger_key"]}
+    await publish_invalidation(client, settings.trigger_invalidation_channel, *keys)
+    return _to_out(row, steps)
+
+
+async def _replace_steps(conn: AsyncConnection, workflow_id: Any, steps: list[WorkflowStep]) -> list[dict[str, Any]]:
+    rows = [
+        {
+            "workflow_id": workflow_id,
+            "step_key": step.key,
+            "action_url": str(step.action_url),
+            "action_method": step.action_method,
+            "action_headers": step.action_headers,
+            "depends_on": step.depends_on,
+        }
+        for step in steps
+    ]
+    await conn.execute(_DELETE_STEPS, {"workflow_id": workflow_id})
+    await conn.execute(_INSERT_STEP, [{**row, "action_headers": json.dumps(row["action_headers"])} for row in rows])
+    return rows
+
+
+def _to_params(data: dict[str, Any]) -> dict[str, Any]:
+    params = dict(data)
+    if "action_url" in params:
+        params["action_url"] = str(params["action_url"])
+    if "action_headers" in params:
+        params["action_headers"] = json.dumps(params["action_headers"])
+    return params
+
+
+def _to_out(row: Any, steps: Any) -> WorkflowOut:
+    return WorkflowOut(
+        id=str(row["id"]),
+        name=row["name"],
+        trigger_key=row["trigger_key"],
+        action_url=row["action_url"],
+        action_method=row["action_method"],
+        action_header_names=sorted(row["action_headers"] or {}),
+        steps=[
+            WorkflowStepOut(
+                key=step["step_key"],
+                action_url=step["action_url"],
+                action_method=step["action_method"],
+                action_header_names=sorted(step["action_headers"] or {}),
+                depends_on=list(step["depends_on"]),
+            )
+            for step in steps
+        ],
+        max_attempts=row["max_attempts"],
+        enabled=row["enabled"],
+        created_at=row["created_at"],
+        updated_at=row["updated_at"],
+    )
@@ -0,0 +1,119 @@
+from datetime import datetime
+
+from pydantic import AnyHttpUrl, BaseModel, Field, model_validator
+
+TRIGGER_KEY_PATTERN = r"^[A-Za-z0-9_-]{8,128}$"
+STEP_KEY_PATTERN = r"^[A-Za-z0-9_-]{1,64}$"
+HTTP_METHOD_PATTERN = r"^(POST|PUT|PATCH)$"
+MAX_WORKFLOW_STEPS = 50
+
+
+class IngestResponse(BaseModel):
+    status: str
+    run_id: str | None = None
+
+
+class WorkflowStep(BaseModel):
+    key: str = Field(pattern=STEP_KEY_PATTERN)
+    action_url: AnyHttpUrl
+    action_method: str = Field(default="POST", pattern=HTTP_METHOD_PATTERN)
+    action_headers: dict[str, str] = Field(default_factory=dict)
+    # Keys of the steps whose success this step waits for.
+    depends_on: list[str] = Field(default_factory=list)
+
+
+def _check_step_graph(steps: list[WorkflowStep]) -> None:
+    dependencies = {step.key: set(step.depends_on) for step in steps}
+    if len(dependencies) != len(steps):
+        raise ValueError("step keys must be unique")
+    for key, deps in dependencies.items():
+        unknown = deps - dependencies.keys()
+        if unknown:
+            raise ValueError(f"step {key} depends on unknown steps: {', '.join(sorted(unknown))}")
+    # Repeatedly peel off steps whose dependencies are all resolved; whatever
+    # is left over sits on a cycle.
+    resolved: set[str] = set()
+    while len(resolved) < len(dependencies):
+        ready = {key for key, deps in dependencies.items() if key not in resolved and deps <= resolved}
+        if not ready:
+            raise ValueError("step dependencies contain a cycle")
+        resolved |= ready
+
+
+class WorkflowCreate(BaseModel):
+    name: str = Field(min_length=1, max_length=200)
+    trigger_key: str = Field(pattern=TRIGGER_KEY_PATTERN)
+    # Either a single action, or steps run as a dependency graph.
+    action_url: AnyHttpUrl | None = None
+    action_method: str = Field(default="POST", pattern=HTTP_METHOD_PATTERN)
+    action_headers: dict[str, str] = Field(default_factory=dict)
+    steps: list[WorkflowStep] | None = Field(default=None, min_length=1, max_length=MAX_WORKFLOW_STEPS)
+    max_attempts: int = Field(default=5, ge=1, le=25)
+    enabled: bool = True
+
+    @model_validator(mode="after")
+    def _check_action(self) -> "WorkflowCreate":
+        if (self.action_url is None) == (self.steps is None):
+            raise ValueError("set exactly one of action_url and steps")
+        if self.steps is not None:
+            _check_step_graph(self.steps)
+        return self
+
+
+class WorkflowUpdate(BaseModel):
+    name: str | None = Field(default=None, min_length=1, max_length=200)
+    trigger_key: str | None = Field(default=None, pattern=TRIGGER_KEY_PATTERN)
+    action_url: AnyHttpUrl | None = None
+    action_method: str | None = Field(default=None, pattern=HTTP_METHOD_PATTERN)
+    action_headers: dict[str, str] | None = None
+    # Replaces all steps; setting action_url instead removes them.
+    steps: list[WorkflowStep] | None = Field(default=None, min_length=1, max_length=MAX_WORKFLOW_STEPS)
+    max_attempts: int | None = Field(default=None, ge=1, le=25)
+    enabled: bool | None = None
+
+    @model_validator(mode="after")
+    def _check_action(self) -> "WorkflowUpdate":
+        if self.action_url is not None and self.steps is not None:
+            raise ValueError("set at most one of action_url and steps")
+        if self.steps is not None:
+            _check_step_graph(self.steps)
+        return self
+
+
+class WorkflowStepOut(BaseModel):
+    key: str
+    action_url: str
+    action_method: str
+    action_header_names: list[str]
+    depends_on: list[str]
+
+
+class WorkflowOut(BaseModel):
+    id: str
+    name: str
+    trigger_key: str
+    action_url: str | None
+    action_method: str
+    # Header values may carry credentials; only their names are returned.
+    action_header_names: list[str]
+    steps: list[WorkflowStepOut] = Field(default_factory=list)
+    max_attempts: int
+    enabled: bool
+    created_at: datetime
+    updated_at: datetime
+
+
+class RunOut(BaseModel):
+    id: str
+    workflow_id: str
+    status: str
+    attempts: int
+    last_error: str | None
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+
+
+class RunPage(BaseModel):
+    items: list[RunOut]
+    next_cursor: str | None = None
@@ -0,0 +1,120 @@
+import math
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class QueueSample:
+    # Entries not yet delivered to a worker plus deliveries not yet acked.
+    depth: int
+    # Age of the oldest entry no worker has picked up yet.
+    lag_seconds: float
+
+
+@dataclass
+class AdmissionStats:
+    admitted: int = 0
+    shed_overload: int = 0
+    shed_quota: int = 0
+    sample_failures: int = 0
+
+
+class _Quota:
+    __slots__ = ("tokens", "updated_at")
+
+    def __init__(self, rate: float, now: float) -> None:
+        self.tokens = max(rate, 1.0)
+        self.updated_at = now
+
+
+class AdmissionController:
+    """Decides whether the API accepts another webhook.
+
+    The decision is made from the last queue sample taken in the background,
+    so admitting a request costs no I/O. Shedding starts when the queue depth
+    or worker lag passes its limit and only stops once both are back under
+    ``resume_ratio`` of their limits, which keeps the API from flapping
+    around the threshold. A limit of 0 disables that check.
+
+    Per-trigger quotas are token buckets holding one second of events; they
+    are enforced per API process. A quota of 0 refuses every event of that
+    trigger with the fixed ``retry_after_seconds``.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_queue_depth: int,
+        max_lag_seconds: float,
+        resume_ratio: float,
+        retry_after_seconds: int,
+        trigger_quotas: dict[str, float],
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_queue_depth = max_queue_depth
+        self.max_lag_seconds = max_lag_seconds
+        self.resume_ratio = resume_ratio
+        self.retry_after_seconds = retry_after_seconds
+        self.trigger_quotas = trigger_quotas
+        self.clock = clock
+        self.stats = AdmissionStats()
+        self.sample: QueueSample | None = None
+        self.shedding = False
+        self._quotas: dict[str, _Quota] = {}
+
+    def update(self, sample: QueueSample) -> None:
+        self.sample = sample
+        if self.shedding:
+            self.shedding = self._over(sample, self.resume_ratio)
+        else:
+            self.shedding = self._over(sample, 1.0)
+
+    def admit(self, trigger_key: str) -> int | None:
+        """Return None to accept the request, or the seconds to put in Retry-After."""
+        if self.shedding:
+            self.stats.shed_overload += 1
+            return self.retry_after_seconds
+
+        rate = self.trigger_quotas.get(trigger_key)
+        if rate is not None and rate <= 0:
+            self.stats.shed_quota += 1
+            return self.retry_after_seconds
+        if rate is not None:
+            wait = self._take(trigger_key, rate)
+            if wait > 0:
+                self.stats.shed_quota += 1
+                return max(1, math.ceil(wait))
+
+        self.stats.admitted += 1
+        return None
+
+    def as_dict(self) -> dict[str, float]:
+        data: dict[str, float] = {
+            "admitted": self.stats.admitted,
+            "shed_overload": self.stats.shed_overload,
+            "shed_quota": self.stats.shed_quota,
+            "sample_failures": self.stats.sample_failures,
+            "shedding": float(self.shedding),
+        }
+        if self.sample is not None:
+            data["queue_depth"] = self.sample.depth
+            data["lag_seconds"] = self.sample.lag_seconds
+        return data
+
+    def _over(self, sample: QueueSample, ratio: float) -> bool:
+        if self.max_queue_depth and sample.depth >= self.max_queue_depth * ratio:
+            return True
+        return bool(self.max_lag_seconds and sample.lag_seconds >= self.max_lag_seconds * ratio)
+
+    def _take(self, trigger_key: str, rate: float) -> float:
+        now = self.clock()
+        quota = self._quotas.get(trigger_key)
+        if quota is None:
+            quota = self._quotas[trigger_key] = _Quota(rate, now)
+        quota.tokens = min(max(rate, 1.0), quota.tokens + (now - quota.updated_at) * rate)
+        quota.updated_at = now
+        if quota.tokens >= 1.0:
+            quota.tokens -= 1.0
+            return 0.0
+        return (1.0 - quota.tokens) / rate
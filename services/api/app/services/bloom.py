@@ -0,0 +1,77 @@
+import hashlib
+import math
+import time
+from typing import Callable
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over string keys."""
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError("invalid_bloom_parameters")
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def add(self, key: str) -> None:
+        for index in self._indexes(key):
+            self._bits[index >> 3] |= 1 << (index & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[index >> 3] & (1 << (index & 7)) for index in self._indexes(key))
+
+    def _indexes(self, key: str) -> list[int]:
+        # Kirsch-Mitzenmacher double hashing: k indexes from one digest.
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+
+class TimeWindowedBloomFilter:
+    """Two-generation bloom filter that forgets keys after one to two windows.
+
+    Lookups check the current and the previous generation. The current one
+    is retired once it is a window old or has reached its capacity, which
+    keeps the false-positive rate near ``error_rate`` under any load.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float,
+        window_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.window_seconds = window_seconds
+        self._clock = clock
+        self._current = BloomFilter(capacity, error_rate)
+        self._previous: BloomFilter | None = None
+        self._rotated_at = clock()
+
+    def add(self, key: str) -> None:
+        self._maybe_rotate()
+        self._current.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        self._maybe_rotate()
+        if key in self._current:
+            return True
+        return self._previous is not None and key in self._previous
+
+    def _maybe_rotate(self) -> None:
+        now = self._clock()
+        if now - self._rotated_at >= 2 * self.window_seconds:
+            self._previous = None
+            self._current = BloomFilter(self.capacity, self.error_rate)
+            self._rotated_at = now
+        elif now - self._rotated_at >= self.window_seconds or self._current.count >= self.capacity:
+            self._previous = self._current
+            self._current = BloomFilter(self.capacity, self.error_rate)
+            self._rotated_at = now
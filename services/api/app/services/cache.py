@@ -0,0 +1,57 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+MISSING = object()
+
+
+class TTLCache(Generic[K, V]):
+    """Bounded LRU cache whose entries also expire after a TTL.
+
+    ``None`` is a legitimate value and is kept under ``negative_ttl_seconds``,
+    so "does not exist" answers can be cached for a shorter time than hits.
+    ``get`` returns ``MISSING`` for absent or expired keys.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl_seconds: float,
+        negative_ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[K, tuple[float, V | None]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> V | None | object:
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V | None) -> None:
+        ttl = self.negative_ttl_seconds if value is None else self.ttl_seconds
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,81 @@
+import hashlib
+from dataclasses import asdict, dataclass
+
+import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
+
+from app.services.bloom import TimeWindowedBloomFilter
+
+
+def build_idempotency_key(workflow_id: str, event_id: str | None, body: bytes) -> str:
+    if event_id:
+        return f"{workflow_id}:{event_id}"
+    return f"{workflow_id}:sha256:{hashlib.sha256(body).hexdigest()}"
+
+
+@dataclass
+class IdempotencyStats:
+    lookups: int = 0
+    local_misses: int = 0
+    local_hits: int = 0
+    false_positives: int = 0
+    redis_duplicates: int = 0
+    db_duplicates: int = 0
+
+    def as_dict(self) -> dict[str, float]:
+        data: dict[str, float] = dict(asdict(self))
+        negatives = self.local_misses + self.false_positives
+        data["false_positive_rate"] = self.false_positives / negatives if negatives else 0.0
+        data["redis_lookups_saved_ratio"] = self.local_misses / self.lookups if self.lookups else 0.0
+        return data
+
+
+class IdempotencyGuard:
+    """Three-tier duplicate check for ingested trigger events.
+
+    1. The in-process filter answers "definitely new" without a round trip.
+       It only knows keys this process has seen, so such answers are
+       confirmed by the run insert's unique constraint in Postgres, which
+       the ingest path pays for anyway.
+    2. Keys the filter may have seen are looked up with ``EXISTS`` in Redis,
+       the authoritative record shared by all API processes. The lookup
+       claims nothing: a run that then fails to be created leaves no record
+       behind, so the sender's retry is accepted.
+    3. Accepted keys are written to Redis in the same transaction as the
+       enqueue (``remember``), so recording them costs no extra round trip
+       either. They only enter the local filter once that transaction went
+       through (``remembered``).
+    """
+
+    def __init__(self, client: redis.Redis, local_filter: TimeWindowedBloomFilter, ttl_seconds: int) -> None:
+        self.client = client
+        self.local_filter = local_filter
+        self.ttl_seconds = ttl_seconds
+        self.stats = IdempotencyStats()
+
+    async def is_duplicate(self, key: str) -> bool:
+        self.stats.lookups += 1
+        if key not in self.local_filter:
+            self.stats.local_misses += 1
+            return False
+
+        self.stats.local_hits += 1
+        if not await self.client.exists(self._redis_key(key)):
+            self.stats.false_positives += 1
+            return False
+        self.stats.redis_duplicates += 1
+        return True
+
+    def remember(self, pipe: Pipeline, key: str) -> None:
+        pipe.set(self._redis_key(key), b"1", ex=self.ttl_seconds)
+
+    def remembered(self, key: str) -> None:
+        self.local_filter.add(key)
+
+    def record_db_duplicate(self, key: str) -> None:
+        self.local_filter.add(key)
+        self.stats.db_duplicates += 1
+
+    @staticmethod
+    def _redis_key(key: str) -> str:
+        return f"danux:idem:{key}"
@@ -0,0 +1,30 @@
+import base64
+import binascii
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Position after the last row of a page, in (created_at, id) order."""
+
+    created_at: datetime
+    id: UUID
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    raw = f"{cursor.created_at.isoformat()}|{cursor.id}".encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(token: str) -> Cursor:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        created_at, run_id = raw.split("|")
+        cursor = Cursor(created_at=datetime.fromisoformat(created_at), id=UUID(run_id))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("invalid_cursor") from exc
+    if cursor.created_at.tzinfo is None:
+        raise ValueError("invalid_cursor")
+    return cursor
@@ -0,0 +1,27 @@
+import asyncio
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+_ENSURE_PARTITIONS = text("SELECT danux_ensure_partitions(:days_ahead)")
+
+
+async def ensure_partitions(engine: AsyncEngine, days_ahead: int, interval_seconds: float) -> None:
+    """Keep the daily partitions this process inserts into created ahead of time.
+
+    The workers run the same maintenance, but ingest must not depend on one
+    being up: without a partition for the current day every insert fails.
+    Dropping expired partitions is left to the workers. The SQL function
+    serialises on an advisory lock, so concurrent calls are harmless.
+    """
+    while True:
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(_ENSURE_PARTITIONS, {"days_ahead": days_ahead})
+        except SQLAlchemyError:
+            logger.exception("partition maintenance failed")
+        await asyncio.sleep(interval_seconds)
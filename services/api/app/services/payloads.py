@@ -0,0 +1,112 @@
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+import zstandard
+from fastapi import HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+
+from danux_shared.cipher import PayloadCipher
+from danux_shared.redaction import Redactor
+
+# A ZstdCompressor must not be used by two threads at once, and large
+# bodies are compressed in the thread pool.
+_local = threading.local()
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Redacted payload as stored in ``payload_blobs``, for history and display.
+
+    ``digest`` is the SHA-256 of the uncompressed snapshot and doubles as its
+    content address, so identical payloads are stored once per day.
+    """
+
+    digest: bytes
+    codec: str
+    size: int
+    data: bytes
+
+
+@dataclass(frozen=True)
+class DeliveryPayload:
+    """Request body as received, as stored in ``run_payloads``.
+
+    This is what the worker sends to the workflow's actions; unlike the
+    snapshot it is not redacted, so ``data`` is encrypted.
+    """
+
+    codec: str
+    data: bytes
+
+
+async def read_body(request: Request, max_bytes: int) -> bytes:
+    """Read the request body, rejecting it as soon as it exceeds ``max_bytes``."""
+    declared = request.headers.get("content-length")
+    if declared is not None:
+        try:
+            too_large = int(declared) > max_bytes
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid_content_length") from exc
+        if too_large:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="payload_too_large")
+
+    chunks: list[bytes] = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="payload_too_large")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def build_payloads(
+    payload: Any,
+    body: bytes,
+    redactor: Redactor,
+    cipher: PayloadCipher,
+    *,
+    compress_min_bytes: int,
+    offload_min_bytes: int,
+) -> tuple[Snapshot, DeliveryPayload]:
+    """Build the snapshot and the delivery payload of an ingested body.
+
+    Redacting, serialising and compressing a body of a few hundred KB takes
+    milliseconds, so from ``offload_min_bytes`` on it runs in the thread
+    pool instead of stalling every other request on the event loop.
+    """
+
+    def build() -> tuple[Snapshot, DeliveryPayload]:
+        return (
+            build_snapshot(payload, redactor, compress_min_bytes),
+            build_delivery(body, cipher, compress_min_bytes),
+        )
+
+    if len(body) >= offload_min_bytes:
+        return await run_in_threadpool(build)
+    return build()
+
+
+def build_snapshot(payload: Any, redactor: Redactor, compress_min_bytes: int) -> Snapshot:
+    raw = json.dumps(redactor.redact(payload), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    digest = hashlib.sha256(raw).digest()
+    # Small bodies gain nothing from compression but still pay for it.
+    if len(raw) >= compress_min_bytes:
+        return Snapshot(digest=digest, codec="zstd", size=len(raw), data=_compress(raw))
+    return Snapshot(digest=digest, codec="identity", size=len(raw), data=raw)
+
+
+def build_delivery(body: bytes, cipher: PayloadCipher, compress_min_bytes: int) -> DeliveryPayload:
+    if len(body) >= compress_min_bytes:
+        return DeliveryPayload(codec="zstd", data=cipher.seal(_compress(body)))
+    return DeliveryPayload(codec="identity", data=cipher.seal(body))
+
+
+def _compress(data: bytes) -> bytes:
+    compressor = getattr(_local, "compressor", None)
+    if compressor is None:
+        compressor = _local.compressor = zstandard.ZstdCompressor(level=3)
+    return compressor.compress(data)
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+from datetime import datetime
+
+import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import RedisError, ResponseError
+
+from app.config import Settings
+from app.services.admission import AdmissionController, QueueSample
+from danux_shared.envelope import encode_job
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_run(pipe: Pipeline, settings: Settings, run_id: str, created_at: datetime) -> None:
+    """Queue an XADD of the run onto ``pipe``; the caller executes it.
+
+    The stream is capped with approximate MAXLEN trimming, which Redis applies
+    cheaply in whole macro-nodes. Acknowledged entries are only removed by this
+    trim, so ``queue_maxlen`` must stay well above the largest backlog the
+    workers are expected to fall behind by.
+    """
+    # created_at is part of the run's primary key; carrying it lets the
+    # worker address the run's partition directly.
+    pipe.xadd(
+        settings.queue_stream,
+        {"job": encode_job(run_id, created_at)},
+        maxlen=settings.queue_maxlen,
+        approximate=True,
+    )
+
+
+def _decode(value: bytes | str) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _entry_ms(entry_id: bytes | str) -> int:
+    return int(_decode(entry_id).split("-", 1)[0])
+
+
+async def sample_queue(client: redis.Redis, stream: str, group: str) -> QueueSample:
+    """Measure the run queue's backlog for one consumer group.
+
+    Stream entry ids start with the millisecond they were added, so the lag
+    is read off the id of the first undelivered entry against Redis' clock.
+    """
+    async with client.pipeline(transaction=False) as pipe:
+        pipe.time()
+        pipe.xinfo_groups(stream)
+        pipe.xlen(stream)
+        clock, groups, length = await pipe.execute()
+
+    info = next((g for g in groups if _decode(g["name"]) == group), None)
+    if info is None:
+        # No worker has joined yet: everything in the stream is backlog.
+        first = await client.xrange(stream, count=1)
+        undelivered, pending = length, 0
+    else:
+        first = await client.xrange(stream, min=f"({_decode(info['last-delivered-id'])}", count=1)
+        pending = info["pending"]
+        # "lag" is unknown (None) after some trims and deletions; fall back
+        # to the stream length, which can only overstate the backlog.
+        undelivered = info.get("lag")
+        if undelivered is None:
+            undelivered = length
+
+    now_ms = int(clock[0]) * 1000 + int(clock[1]) // 1000
+    lag_seconds = max(0.0, (now_ms - _entry_ms(first[0][0])) / 1000) if first else 0.0
+    return QueueSample(depth=undelivered + pending, lag_seconds=lag_seconds)
+
+
+async def run_sampler(client: redis.Redis, settings: Settings, controller: AdmissionController) -> None:
+    """Refresh the controller's queue sample until cancelled."""
+    while True:
+        try:
+            controller.update(await sample_queue(client, settings.queue_stream, settings.queue_group))
+        except ResponseError as exc:
+            if "no such key" in str(exc).lower():
+                # The stream doesn't exist until the first enqueue.
+                controller.update(QueueSample(depth=0, lag_seconds=0.0))
+            else:
+                controller.stats.sample_failures += 1
+                logger.warning("queue sample failed: %s", exc)
+        except RedisError:
+            # Keep deciding on the last sample; ingest itself fails while
+            # Redis is unreachable.
+            controller.stats.sample_failures += 1
+            logger.warning("queue sample failed", exc_info=True)
+        await asyncio.sleep(settings.admission_sample_interval_seconds)
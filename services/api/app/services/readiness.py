@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+# A probe checks one dependency and may return details worth reporting,
+# such as pool usage; it signals failure by raising.
+Probe = Callable[[], Awaitable[dict[str, float] | None]]
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    ok: bool
+    latency_ms: float
+    checked_at: float
+    error: str | None = None
+    details: dict[str, float] = field(default_factory=dict)
+
+
+class Readiness:
+    """Whether this process should be sent traffic.
+
+    Dependencies are probed in the background and ``/ready`` answers from
+    the last results, so load balancer polling never touches Postgres or
+    Redis. The process is ready once the startup warm-up has finished and
+    every probe's latest result passed and is younger than
+    ``stale_after_seconds``; a probe loop that stopped running therefore
+    makes the process unready instead of reporting old good news.
+    """
+
+    def __init__(
+        self,
+        probes: Mapping[str, Probe],
+        *,
+        timeout_seconds: float,
+        stale_after_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.probes = probes
+        self.timeout_seconds = timeout_seconds
+        self.stale_after_seconds = stale_after_seconds
+        self.clock = clock
+        self.warmed_up = False
+        self.results: dict[str, ProbeResult] = {}
+
+    @property
+    def ready(self) -> bool:
+        if not self.warmed_up:
+            return False
+        now = self.clock()
+        for name in self.probes:
+            result = self.results.get(name)
+            if result is None or not result.ok or now - result.checked_at > self.stale_after_seconds:
+                return False
+        return True
+
+    async def probe_once(self) -> None:
+        """Run every probe concurrently and record the results."""
+        names = list(self.probes)
+        results = await asyncio.gather(*(self._probe(self.probes[name]) for name in names))
+        for name, result in zip(names, results):
+            previous = self.results.get(name)
+            if previous is not None and previous.ok and not result.ok:
+                logger.warning("readiness probe failing", extra={"probe": name, "error": result.error})
+            self.results[name] = result
+
+    def as_dict(self) -> dict[str, object]:
+        now = self.clock()
+        checks: dict[str, object] = {}
+        for name in self.probes:
+            result = self.results.get(name)
+            if result is None:
+                checks[name] = {"ok": False, "error": "not_probed"}
+                continue
+            checks[name] = {
+                "ok": result.ok,
+                "latency_ms": round(result.latency_ms, 3),
+                "age_seconds": round(now - result.checked_at, 3),
+                "error": result.error,
+                **result.details,
+            }
+        return {"status": "ready" if self.ready else "not_ready", "warmed_up": self.warmed_up, "checks": checks}
+
+    async def _probe(self, probe: Probe) -> ProbeResult:
+        started = self.clock()
+        try:
+            details = await asyncio.wait_for(probe(), timeout=self.timeout_seconds)
+        except asyncio.TimeoutError:
+            return ProbeResult(False, (self.clock() - started) * 1000, self.clock(), "timeout")
+        except Exception as exc:
+            # Only the type: messages can carry connection strings.
+            return ProbeResult(False, (self.clock() - started) * 1000, self.clock(), type(exc).__name__)
+        return ProbeResult(True, (self.clock() - started) * 1000, self.clock(), details=details or {})
+
+
+async def run_probes(readiness: Readiness, interval_seconds: float) -> None:
+    """Refresh the probe results every ``interval_seconds`` until cancelled."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        await readiness.probe_once()
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.services.cache import MISSING, TTLCache
+
+logger = logging.getLogger(__name__)
+
+INVALIDATE_ALL = "*"
+
+_RESOLVE_TRIGGER = text("SELECT id FROM workflows WHERE trigger_key = :trigger_key AND enabled")
+_PRIME_TRIGGERS = text(
+    "SELECT trigger_key, id FROM workflows WHERE enabled ORDER BY updated_at DESC LIMIT :limit"
+)
+
+
+@dataclass(frozen=True)
+class ResolvedTrigger:
+    workflow_id: str
+
+
+class TriggerResolver:
+    """Resolves trigger keys to workflows through an in-process cache.
+
+    Unknown keys are cached as negatives so that scanners probing random
+    trigger keys are answered from memory. Concurrent misses for the same
+    key share one query.
+    """
+
+    def __init__(self, engine: AsyncEngine, cache: TTLCache[str, ResolvedTrigger]) -> None:
+        self.engine = engine
+        self.cache = cache
+        self._inflight: dict[str, asyncio.Future[ResolvedTrigger | None]] = {}
+        self._generation = 0
+
+    async def resolve(self, trigger_key: str) -> ResolvedTrigger | None:
+        cached = self.cache.get(trigger_key)
+        if cached is not MISSING:
+            return cached  # type: ignore[return-value]
+
+        inflight = self._inflight.get(trigger_key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future: asyncio.Future[ResolvedTrigger | None] = asyncio.get_running_loop().create_future()
+        self._inflight[trigger_key] = future
+        generation = self._generation
+        try:
+            resolved = await self._load(trigger_key)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark the exception as retrieved when nobody else was waiting.
+            future.exception()
+            raise
+        finally:
+            del self._inflight[trigger_key]
+
+        # An invalidation that arrived while the query ran may describe a
+        # newer state than the one just read; don't cache over it.
+        if generation == self._generation:
+            self.cache.set(trigger_key, resolved)
+        future.set_result(resolved)
+        return resolved
+
+    async def prime(self, limit: int) -> int:
+        """Cache up to ``limit`` enabled triggers, most recently updated first.
+
+        Returns how many were cached; nothing is cached if an invalidation
+        arrived while the query ran.
+        """
+        generation = self._generation
+        async with self.engine.connect() as conn:
+            rows = (await conn.execute(_PRIME_TRIGGERS, {"limit": min(limit, self.cache.maxsize)})).all()
+        if generation != self._generation:
+            return 0
+        # Oldest first, so the most recent triggers end up least likely to be
+        # evicted.
+        for row in reversed(rows):
+            self.cache.set(row.trigger_key, ResolvedTrigger(workflow_id=str(row.id)))
+        return len(rows)
+
+    def invalidate(self, trigger_key: str) -> None:
+        self._generation += 1
+        if trigger_key == INVALIDATE_ALL:
+            self.cache.clear()
+        else:
+            self.cache.invalidate(trigger_key)
+
+    async def _load(self, trigger_key: str) -> ResolvedTrigger | None:
+        async with self.engine.connect() as conn:
+            workflow_id = (await conn.execute(_RESOLVE_TRIGGER, {"trigger_key": trigger_key})).scalar()
+        return None if workflow_id is None else ResolvedTrigger(workflow_id=str(workflow_id))
+
+
+async def publish_invalidation(client: redis.Redis, channel: str, *trigger_keys: str) -> None:
+    for trigger_key in trigger_keys:
+        await client.publish(channel, trigger_key)
+
+
+async def listen_for_invalidations(
+    client: redis.Redis,
+    channel: str,
+    resolver: TriggerResolver,
+    subscribed: asyncio.Event | None = None,
+) -> None:
+    """Apply invalidations published by any API process until cancelled.
+
+    Messages sent while the subscription is down are lost, so the whole
+    cache is dropped every time the subscription is (re)established.
+    ``subscribed`` is set once the first subscription is up, after which
+    the cache can be primed without the listener wiping it.
+    """
+    while True:
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(channel)
+            resolver.invalidate(INVALIDATE_ALL)
+            if subscribed is not None:
+                subscribed.set()
+            async for message in pubsub.listen():
+                data = message["data"]
+                resolver.invalidate(data.decode() if isinstance(data, bytes) else str(data))
+        except RedisError:
+            logger.exception("trigger invalidation subscription lost, resubscribing")
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.aclose()
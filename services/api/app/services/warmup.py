@@ -0,0 +1,48 @@
+import asyncio
+from typing import Any
+
+import redis.asyncio as redis
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.services.readiness import Probe
+
+_PING = text("SELECT 1")
+
+
+async def warm_engine(engine: AsyncEngine, connections: int) -> None:
+    """Open ``connections`` database connections and return them to the pool.
+
+    The connections are checked out at the same time, so the pool really
+    holds that many afterwards instead of reusing one connection N times.
+    """
+
+    async def ping() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(_PING)
+
+    await asyncio.gather(*(ping() for _ in range(connections)))
+
+
+async def warm_redis(client: redis.Redis, connections: int) -> None:
+    """Open ``connections`` Redis connections; concurrent PINGs each need their own."""
+    await asyncio.gather(*(client.ping() for _ in range(connections)))
+
+
+def database_probe(engine: AsyncEngine) -> Probe:
+    async def probe() -> dict[str, float]:
+        async with engine.connect() as conn:
+            await conn.execute(_PING)
+        pool: Any = engine.pool
+        return {"pool_size": pool.size(), "pool_in_use": pool.checkedout(), "pool_idle": pool.checkedin()}
+
+    return probe
+
+
+def redis_probe(client: redis.Redis) -> Probe:
+    async def probe() -> dict[str, float]:
+        await client.ping()
+        pool: Any = client.connection_pool
+        return {"pool_in_use": len(pool._in_use_connections), "pool_idle": len(pool._available_connections)}
+
+    return probe
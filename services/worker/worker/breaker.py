@@ -0,0 +1,60 @@
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+
+@dataclass
+class _HostState:
+    failures: int = 0
+    opened_at: float | None = None
+    probe_started_at: float | None = None
+
+
+class CircuitBreakers:
+    """Per-destination circuit breakers.
+
+    A host's breaker opens after ``failure_threshold`` consecutive failures
+    and rejects requests for ``open_seconds``. After that a single probe is
+    let through; its success closes the breaker, its failure reopens it.
+    Only hosts with recent failures are tracked, so memory stays bounded by
+    the number of unhealthy destinations.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        open_seconds: float,
+        probe_retry_seconds: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.probe_retry_seconds = probe_retry_seconds
+        self._clock = clock
+        self._hosts: dict[str, _HostState] = {}
+
+    def before_request(self, host: str) -> float:
+        """Return 0 if a request to ``host`` may go out now, else seconds to wait."""
+        state = self._hosts.get(host)
+        if state is None or state.opened_at is None:
+            return 0.0
+        now = self._clock()
+        reopen_at = state.opened_at + self.open_seconds
+        if now < reopen_at:
+            return reopen_at - now
+        # Half-open. A probe that never reported back (its job crashed)
+        # stops blocking new probes after another open period.
+        if state.probe_started_at is not None and now - state.probe_started_at < self.open_seconds:
+            return self.probe_retry_seconds
+        state.probe_started_at = now
+        return 0.0
+
+    def record_success(self, host: str) -> None:
+        self._hosts.pop(host, None)
+
+    def record_failure(self, host: str) -> None:
+        state = self._hosts.setdefault(host, _HostState())
+        state.failures += 1
+        if state.probe_started_at is not None or state.failures >= self.failure_threshold:
+            state.opened_at = self._clock()
+            state.probe_started_at = None
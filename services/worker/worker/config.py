@@ -0,0 +1,86 @@
+from functools import lru_cache
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    database_url: str
+    redis_url: str
+    # Encrypts the request bodies kept for delivery (run_payloads).
+    app_encryption_key: str
+    log_level: str = "INFO"
+    # Added to the built-in redaction key words and value regexes for logs.
+    redaction_extra_keys: list[str] = []
+    redaction_extra_patterns: list[str] = []
+
+    worker_concurrency: int = 1
+    shutdown_grace_seconds: float = 30.0
+
+    queue_stream: str = "danux:runs"
+    queue_group: str = "workers"
+    queue_batch_size: int = 16
+    queue_block_ms: int = 1000
+    queue_claim_idle_ms: int = 300_000
+    queue_claim_interval_seconds: float = 15.0
+    queue_max_deliveries: int = 5
+    queue_consumer_expiry_ms: int = 86_400_000
+    queue_maxlen: int = 1_000_000
+    # Runs still 'queued' in Postgres that no stream entry can account for,
+    # e.g. because the API's enqueue failed after the run was committed, are
+    # put back on the stream, as are 'retry_scheduled' runs whose retry is
+    # overdue, e.g. because Redis lost the delayed-retry set. A run counts as
+    # stranded once it (or its retry) is older than both the oldest
+    # undelivered entry and the claim idle time by this much.
+    queue_requeue_grace_seconds: float = 60.0
+    queue_requeue_interval_seconds: float = 30.0
+    queue_requeue_batch_size: int = 500
+
+    retry_key: str = "danux:runs:delayed"
+    retry_base_seconds: float = 2.0
+    retry_cap_seconds: float = 900.0
+    retry_promote_batch_size: int = 500
+    retry_poll_seconds: float = 0.5
+
+    db_pool_size: int = 5
+    db_max_overflow: int = 5
+    db_pool_timeout_seconds: float = 10.0
+
+    log_buffer_size: int = 10_000
+    log_batch_size: int = 500
+    log_flush_interval_seconds: float = 0.005
+
+    destination_rate_per_second: float = 50.0
+    destination_burst: int = 100
+    # Per-host rate overrides, e.g. {"hooks.example.com": 5}.
+    destination_rate_overrides: dict[str, float] = {}
+    destination_lease_size: int = 10
+    destination_lease_seconds: float = 1.0
+    destination_max_wait_seconds: float = 0.5
+    breaker_failure_threshold: int = 5
+    breaker_open_seconds: float = 30.0
+
+    # Largest JSON response of a workflow step kept for the steps after it.
+    step_output_max_bytes: int = 65_536
+
+    partition_days_ahead: int = 7
+    partition_maintenance_interval_seconds: float = 3_600.0
+    # 0 keeps run history forever.
+    runs_retention_days: int = 0
+
+    # Prometheus scrape listener; port 0 disables it.
+    metrics_host: str = "0.0.0.0"
+    metrics_port: int = 9100
+
+    http_pool_limit: int = 100
+    http_pool_limit_per_host: int = 10
+    http_dns_cache_seconds: int = 300
+    http_keepalive_seconds: float = 30.0
+    http_connect_timeout_seconds: float = 5.0
+    http_total_timeout_seconds: float = 30.0
+
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
@@ -0,0 +1,113 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Collection, Mapping
+from dataclasses import dataclass, field
+
+
+def topological_order(dependencies: Mapping[str, Collection[str]]) -> list[str]:
+    """Order step keys so every step comes after the steps it depends on.
+
+    Raises ValueError for a dependency on an unknown step or for a cycle.
+    """
+    for deps in dependencies.values():
+        if any(dep not in dependencies for dep in deps):
+            raise ValueError("unknown_dependency")
+
+    waiting = {key: len(set(deps)) for key, deps in dependencies.items()}
+    dependents = _dependents(dependencies)
+    ready = sorted(key for key, count in waiting.items() if count == 0)
+    order: list[str] = []
+    while ready:
+        key = ready.pop()
+        order.append(key)
+        for dependent in dependents[key]:
+            waiting[dependent] -= 1
+            if waiting[dependent] == 0:
+                ready.append(dependent)
+    if len(order) != len(dependencies):
+        raise ValueError("dependency_cycle")
+    return order
+
+
+@dataclass
+class DagResult:
+    succeeded: set[str] = field(default_factory=set)
+    failed: set[str] = field(default_factory=set)
+    # Not run because a step they depend on, directly or not, failed.
+    blocked: set[str] = field(default_factory=set)
+
+
+async def run_dag(
+    dependencies: Mapping[str, Collection[str]],
+    run_step: Callable[[str], Awaitable[bool]],
+    *,
+    succeeded: Collection[str] = (),
+    failed: Collection[str] = (),
+) -> DagResult:
+    """Run every step whose dependencies succeeded, as soon as they have.
+
+    Independent steps run concurrently, so the DAG takes as long as its
+    critical path; callers bound overall concurrency inside ``run_step``.
+    ``succeeded`` and ``failed`` carry the outcome of earlier attempts:
+    those steps are not run again, so a retry only re-runs the branches
+    that did not complete. A step that fails blocks its descendants while
+    unrelated branches carry on. If ``run_step`` raises, the steps still
+    running are cancelled and the exception propagates.
+    """
+    topological_order(dependencies)
+    result = DagResult(succeeded=set(succeeded), failed=set(failed))
+    dependents = _dependents(dependencies)
+    for key in result.failed:
+        _block(key, dependents, result)
+
+    def is_ready(key: str) -> bool:
+        return (
+            key not in result.succeeded
+            and key not in result.failed
+            and key not in result.blocked
+            and all(dep in result.succeeded for dep in dependencies[key])
+        )
+
+    running: dict[asyncio.Task[bool], str] = {}
+
+    def start(key: str) -> None:
+        running[asyncio.create_task(run_step(key), name=f"step-{key}")] = key
+
+    for key in dependencies:
+        if is_ready(key):
+            start(key)
+    try:
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                key = running.pop(task)
+                if task.result():
+                    result.succeeded.add(key)
+                    for dependent in dependents[key]:
+                        if is_ready(dependent) and dependent not in running.values():
+                            start(dependent)
+                else:
+                    result.failed.add(key)
+                    _block(key, dependents, result)
+    finally:
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+    return result
+
+
+def _dependents(dependencies: Mapping[str, Collection[str]]) -> dict[str, list[str]]:
+    dependents: dict[str, list[str]] = {key: [] for key in dependencies}
+    for key, deps in dependencies.items():
+        for dep in set(deps):
+            dependents[dep].append(key)
+    return dependents
+
+
+def _block(key: str, dependents: Mapping[str, list[str]], result: DagResult) -> None:
+    stack = list(dependents[key])
+    while stack:
+        dependent = stack.pop()
+        if dependent not in result.blocked and dependent not in result.succeeded:
+            result.blocked.add(dependent)
+            stack.extend(dependents[dependent])
@@ -0,0 +1,16 @@
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from worker.config import Settings
+
+
+def create_engine(settings: Settings) -> AsyncEngine:
+    # One pool per worker process, shared by every job coroutine. Jobs only
+    # hold a connection for the duration of a single short transaction, so the
+    # pool can stay much smaller than the job concurrency.
+    return create_async_engine(
+        settings.database_url,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_pre_ping=True,
+    )
@@ -0,0 +1,68 @@
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import aiohttp
+
+
+@dataclass
+class WebhookAction:
+    url: str
+    method: str = "POST"
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class ActionResult:
+    ok: bool
+    status_code: int | None
+    duration_ms: int
+    error: str | None = None
+    # Decoded JSON response body, when requested and small enough.
+    output: Any = None
+
+
+async def execute_action(
+    session: aiohttp.ClientSession,
+    action: WebhookAction,
+    body: bytes,
+    *,
+    output_max_bytes: int = 0,
+) -> ActionResult:
+    """Send ``body``, a JSON document, to the action; an empty body sends none."""
+    headers = action.headers
+    if body and not any(name.lower() == "content-type" for name in headers):
+        headers = {**headers, "Content-Type": "application/json"}
+    started = time.perf_counter()
+    try:
+        async with session.request(action.method, action.url, data=body or None, headers=headers) as response:
+            # Drain the body so the connection goes back to the keep-alive pool
+            # instead of being closed on release.
+            response_body = await response.read()
+            status = response.status
+            is_json = response.content_type == "application/json"
+    except asyncio.TimeoutError:
+        return ActionResult(ok=False, status_code=None, duration_ms=_elapsed_ms(started), error="timeout")
+    except aiohttp.ClientError as exc:
+        return ActionResult(ok=False, status_code=None, duration_ms=_elapsed_ms(started), error=type(exc).__name__)
+
+    ok = 200 <= status < 300
+    output = None
+    if ok and is_json and 0 < len(response_body) <= output_max_bytes:
+        try:
+            output = json.loads(response_body)
+        except ValueError:
+            output = None
+    return ActionResult(
+        ok=ok,
+        status_code=status,
+        duration_ms=_elapsed_ms(started),
+        error=None if ok else f"http_{status}",
+        output=output,
+    )
+
+
+def _elapsed_ms(started: float) -> int:
+    return int((time.perf_counter() - started) * 1000)
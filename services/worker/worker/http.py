@@ -0,0 +1,23 @@
+import aiohttp
+
+from worker.config import Settings
+
+
+def create_session(settings: Settings) -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=settings.http_pool_limit,
+        limit_per_host=settings.http_pool_limit_per_host,
+        use_dns_cache=True,
+        ttl_dns_cache=settings.http_dns_cache_seconds,
+        keepalive_timeout=settings.http_keepalive_seconds,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=settings.http_total_timeout_seconds,
+        sock_connect=settings.http_connect_timeout_seconds,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        headers={"User-Agent": "danux-worker/0.1"},
+        raise_for_status=False,
+    )
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import aiohttp
+import redis.asyncio as redis
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from danux_shared.metrics import Registry
+
+logger = logging.getLogger(__name__)
+
+_QUANTILES = (0.5, 0.95, 0.99)
+
+
+class WorkerMetrics:
+    def __init__(self) -> None:
+        self.registry = registry = Registry()
+        self.jobs = registry.counter("danux_worker_jobs_total", "Jobs handled, by outcome.", ("outcome",))
+        self.job_duration = registry.histogram(
+            "danux_worker_job_duration_seconds", "Time a slot spent on one job, from claim to status commit."
+        )
+        self.job_duration_quantiles = registry.gauge(
+            "danux_worker_job_duration_quantile_seconds",
+            "Job duration percentiles since start, estimated from the histogram buckets.",
+            ("quantile",),
+        )
+        self.queue_latency = registry.histogram(
+            "danux_worker_queue_latency_seconds",
+            "Time from a job being added to the stream to a slot starting it.",
+            buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0),
+        )
+        self.steps = registry.counter(
+            "danux_worker_steps_total", "Steps of multi-step workflows executed, by outcome.", ("outcome",)
+        )
+        self.delivery_duration = registry.histogram(
+            "danux_worker_delivery_duration_seconds", "Outbound webhook request latency."
+        )
+        self.retries_promoted = registry.counter(
+            "danux_worker_retries_promoted_total", "Delayed retries moved back onto the run stream."
+        )
+        self.stream_dead_letters = registry.counter(
+            "danux_worker_stream_dead_letters_total", "Queue entries dead-lettered after too many deliveries."
+        )
+        self.retry_backlog = registry.gauge("danux_worker_retry_backlog", "Jobs parked in the delayed-retry set.")
+        self.busy_slots = registry.gauge("danux_worker_busy_slots", "Job slots currently running a job.")
+        self.db_pool = registry.gauge("danux_db_pool_connections", "Database pool connections by state.", ("state",))
+        self.redis_pool = registry.gauge(
+            "danux_redis_pool_connections", "Redis pool connections by state.", ("state",)
+        )
+        self.http_pool = registry.gauge(
+            "danux_http_pool_connections", "Outbound HTTP connections by state.", ("state",)
+        )
+        # Bumped by the job slots; read when metrics are collected.
+        self.running = 0
+        registry.on_collect(self._collect_jobs)
+
+    def watch(
+        self,
+        engine: AsyncEngine,
+        client: redis.Redis,
+        http: aiohttp.ClientSession,
+        *,
+        dead_lettered: Callable[[], int],
+        promoted: Callable[[], int],
+    ) -> None:
+        def collect() -> None:
+            pool: Any = engine.pool
+            self.db_pool.set(pool.checkedout(), "in_use")
+            self.db_pool.set(pool.checkedin(), "idle")
+            self.db_pool.set(max(0, pool.overflow()), "overflow")
+            self.db_pool.set(pool.size(), "size")
+            redis_pool: Any = client.connection_pool
+            self.redis_pool.set(len(redis_pool._in_use_connections), "in_use")
+            self.redis_pool.set(len(redis_pool._available_connections), "idle")
+            connector: Any = http.connector
+            self.http_pool.set(len(connector._acquired), "in_use")
+            self.http_pool.set(connector.limit, "limit")
+            self.stream_dead_letters.set_total(dead_lettered())
+            self.retries_promoted.set_total(promoted())
+
+        self.registry.on_collect(collect)
+
+    def _collect_jobs(self) -> None:
+        self.busy_slots.set(self.running)
+        for q in _QUANTILES:
+            self.job_duration_quantiles.set(self.job_duration.quantile(q), str(q))
+
+
+async def serve_metrics(
+    metrics: WorkerMetrics,
+    host: str,
+    port: int,
+    refresh: Callable[[], Awaitable[None]],
+) -> asyncio.AbstractServer:
+    """Serve ``GET /metrics`` on a plain asyncio listener.
+
+    It runs on the worker's event loop, so rendering never races the job
+    slots updating the metrics. ``refresh`` is awaited before each scrape to
+    read values that need a round trip.
+    """
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.split()
+            if len(parts) >= 2 and parts[0] == b"GET" and parts[1].split(b"?")[0] == b"/metrics":
+                await refresh()
+                status, body = "200 OK", metrics.registry.render().encode()
+            else:
+                status, body = "404 Not Found", b"not found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        except Exception:
+            logger.exception("metrics scrape failed")
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
@@ -0,0 +1,401 @@
+import asyncio
+import json
+import logging
+import random
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+from urllib.parse import urlsplit
+
+import aiohttp
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from danux_shared.cipher import PayloadCipher
+from danux_shared.envelope import decode_job, encode_job
+from worker.breaker import CircuitBreakers
+from worker.config import Settings
+from worker.dag import run_dag
+from worker.executor import ActionResult, WebhookAction, execute_action
+from worker.instrumentation import WorkerMetrics
+from worker.logwriter import LogWriter
+from worker.payloads import open_delivery
+from worker.queue import Delivery
+from worker.ratelimit import SharedRateLimiter
+from worker.retry import backoff_delay, is_retryable
+from worker.scheduler import RetryScheduler
+
+logger = logging.getLogger(__name__)
+
+# 'running' is claimable too: a job redelivered after a worker crash must be
+# able to pick its run back up. 'retry_scheduled' runs come back through the
+# delayed-retry scheduler.
+_CLAIM_RUN = text(
+    """
+    UPDATE runs AS r
+    SET status = 'running',
+        attempts = r.attempts + 1,
+        started_at = coalesce(r.started_at, now()),
+        updated_at = now()
+    FROM workflows AS w, run_payloads AS p
+    WHERE r.id = :run_id
+      AND r.created_at = CAST(:created_at AS timestamptz)
+      AND w.id = r.workflow_id
+      AND p.run_id = r.id
+      AND p.created_at = r.created_at
+      AND r.status IN ('queued', 'running', 'retry_scheduled')
+    RETURNING
+        r.attempts,
+        r.workflow_id,
+        p.codec AS payload_codec,
+        p.data AS payload_data,
+        w.action_url,
+        w.action_method,
+        w.action_headers,
+        w.max_attempts
+    """
+)
+
+
+# Runs whose queue entry kept failing before the run reached an outcome.
+_DEAD_LETTER_RUNS = text(
+    """
+    UPDATE runs AS r
+    SET status = 'dead_lettered',
+        last_error = :error,
+        next_attempt_at = NULL,
+        finished_at = now(),
+        updated_at = now()
+    FROM unnest(CAST(:run_id AS uuid[]), CAST(:created_at AS timestamptz[])) AS u(run_id, created_at)
+    WHERE r.id = u.run_id
+      AND r.created_at = u.created_at
+      AND r.status IN ('queued', 'running', 'retry_scheduled')
+    """
+)
+
+# Multi-step workflows only. The outcome each step reached on earlier
+# attempts of the run comes along, so finished steps are not run again.
+_SELECT_STEPS = text(
+    """
+    SELECT s.step_key, s.action_url, s.action_method, s.action_headers, s.depends_on, rs.status, rs.output
+    FROM workflow_steps AS s
+    LEFT JOIN run_steps AS rs
+        ON rs.run_id = :run_id
+        AND rs.created_at = CAST(:created_at AS timestamptz)
+        AND rs.step_key = s.step_key
+    WHERE s.workflow_id = :workflow_id
+    """
+)
+
+# Step outcomes that are final for the run: such steps are never re-run.
+_FINAL_STEP_FAILURES = ("failed", "dead_lettered")
+
+
+@dataclass
+class Job:
+    run_id: str
+    created_at: str
+
+    @classmethod
+    def from_raw(cls, raw: bytes | str | None) -> "Job":
+        if not isinstance(raw, bytes):
+            raise ValueError("invalid_job")
+        run_id, created_at = decode_job(raw)
+        return cls(run_id=run_id, created_at=created_at.isoformat())
+
+    def to_raw(self) -> bytes:
+        return encode_job(self.run_id, datetime.fromisoformat(self.created_at))
+
+
+@dataclass
+class JobContext:
+    engine: AsyncEngine
+    http: aiohttp.ClientSession
+    retries: RetryScheduler
+    limiter: SharedRateLimiter
+    breakers: CircuitBreakers
+    # Caps outbound requests across job slots and parallel workflow steps.
+    request_slots: asyncio.Semaphore
+    writer: LogWriter
+    metrics: WorkerMetrics
+    settings: Settings
+    cipher: PayloadCipher
+
+
+async def dead_letter_runs(engine: AsyncEngine, deliveries: list[Delivery], max_deliveries: int) -> None:
+    """Mark the runs of dead-lettered queue entries as such in Postgres.
+
+    Without this a run whose job kept failing after the claim would show as
+    'running' forever, and one still 'queued' would be put back on the
+    stream by the stranded-run sweep.
+    """
+    jobs = []
+    for delivery in deliveries:
+        with suppress(ValueError):
+            jobs.append(Job.from_raw(delivery.fields.get(b"job")))
+    if not jobs:
+        return
+    async with engine.begin() as conn:
+        await conn.execute(
+            _DEAD_LETTER_RUNS,
+            {
+                "run_id": [job.run_id for job in jobs],
+                "created_at": [job.created_at for job in jobs],
+                "error": f"queue entry delivered more than {max_deliveries} times",
+            },
+        )
+
+
+async def handle_job(ctx: JobContext, job: Job) -> None:
+    params = {"run_id": job.run_id, "created_at": job.created_at}
+    steps = None
+    async with ctx.engine.begin() as conn:
+        row = (await conn.execute(_CLAIM_RUN, params)).mappings().first()
+        if row is not None and row["action_url"] is None:
+            steps = (
+                await conn.execute(_SELECT_STEPS, {**params, "workflow_id": row["workflow_id"]})
+            ).mappings().all()
+    if row is None:
+        ctx.metrics.jobs.inc("skipped")
+        logger.info("run not claimable, skipping", extra={"run_id": job.run_id})
+        return
+    if steps is not None:
+        await _run_steps(ctx, job, row, steps)
+        return
+
+    action = WebhookAction(
+        url=row["action_url"],
+        method=row["action_method"],
+        headers=dict(row["action_headers"] or {}),
+    )
+    host = urlsplit(action.url).hostname or ""
+    wait = await _destination_wait(ctx, host)
+    if wait > 0:
+        await _defer(ctx, job, host, wait)
+        return
+
+    # The body as received, not the redacted snapshot kept for history.
+    body = open_delivery(row["payload_codec"], row["payload_data"], ctx.cipher)
+    async with ctx.request_slots:
+        result = await execute_action(ctx.http, action, body)
+    _record_result(ctx, host, result)
+
+    attempt = row["attempts"]
+    outcome = _attempt_outcome(result, attempt, row["max_attempts"])
+    delay = 0.0
+    if outcome == "retry_scheduled":
+        delay = backoff_delay(attempt, ctx.settings.retry_base_seconds, ctx.settings.retry_cap_seconds)
+
+    await ctx.writer.attempt(job.run_id, attempt, result.status_code, result.duration_ms, result.error)
+    await ctx.writer.log(
+        job.run_id,
+        "info" if result.ok else "warning",
+        f"attempt {attempt}: {outcome} (status {result.status_code or '-'}, {result.duration_ms} ms)",
+    )
+    await ctx.writer.status(
+        job.run_id,
+        job.created_at,
+        outcome,
+        error=result.error,
+        delay_seconds=delay if outcome == "retry_scheduled" else None,
+        finished=outcome != "retry_scheduled",
+    )
+    # Parked only after the run row says so; if this process dies in between,
+    # the unacknowledged stream entry is reclaimed and the run retried early.
+    if outcome == "retry_scheduled":
+        await ctx.retries.schedule(job.to_raw(), delay)
+    ctx.metrics.jobs.inc(outcome)
+
+    logger.info(
+        "run attempt finished",
+        extra={
+            "run_id": job.run_id,
+            "attempt": attempt,
+            "outcome": outcome,
+            "status_code": result.status_code,
+            "duration_ms": result.duration_ms,
+        },
+    )
+
+
+async def _run_steps(ctx: JobContext, job: Job, row: Any, step_rows: Any) -> None:
+    """Run the steps of a multi-step workflow as a DAG.
+
+    Steps that succeeded or failed for good on an earlier attempt are
+    skipped, so a retry only re-runs the branches that did not finish. The
+    run is retried while any step can still succeed.
+    """
+    attempt = row["attempts"]
+    body = open_delivery(row["payload_codec"], row["payload_data"], ctx.cipher)
+    steps = {step["step_key"]: step for step in step_rows}
+    dependencies = {key: tuple(step["depends_on"] or ()) for key, step in steps.items()}
+    # Outcome of every step that has one, this attempt's overriding earlier
+    # ones.
+    outcomes: dict[str, str] = {key: step["status"] for key, step in steps.items() if step["status"]}
+    outputs = {key: step["output"] for key, step in steps.items() if step["status"] == "succeeded"}
+    # Error of every step executed by this attempt.
+    errors: dict[str, str | None] = {}
+    waits: list[float] = []
+
+    async def run_step(key: str) -> bool:
+        step = steps[key]
+        action = WebhookAction(
+            url=step["action_url"],
+            method=step["action_method"],
+            headers=dict(step["action_headers"] or {}),
+        )
+        host = urlsplit(action.url).hostname or ""
+        wait = await _destination_wait(ctx, host)
+        if wait > 0:
+            outcomes[key] = "deferred"
+            waits.append(wait)
+            return False
+
+        step_body = body
+        if dependencies[key]:
+            step_body = json.dumps(
+                {
+                    "payload": json.loads(body) if body else None,
+                    "steps": {dep: outputs.get(dep) for dep in dependencies[key]},
+                }
+            ).encode()
+        async with ctx.request_slots:
+            result = await execute_action(
+                ctx.http, action, step_body, output_max_bytes=ctx.settings.step_output_max_bytes
+            )
+        _record_result(ctx, host, result)
+
+        outcome = _attempt_outcome(result, attempt, row["max_attempts"])
+        outcomes[key] = outcome
+        errors[key] = result.error
+        if result.ok:
+            outputs[key] = result.output
+        await ctx.writer.attempt(
+            job.run_id, attempt, result.status_code, result.duration_ms, result.error, step_key=key
+        )
+        await ctx.writer.log(
+            job.run_id,
+            "info" if result.ok else "warning",
+            f"step {key} attempt {attempt}: {outcome} "
+            f"(status {result.status_code or '-'}, {result.duration_ms} ms)",
+        )
+        await ctx.writer.step(
+            job.run_id,
+            job.created_at,
+            key,
+            outcome,
+            status_code=result.status_code,
+            error=result.error,
+            output=result.output,
+        )
+        ctx.metrics.steps.inc(outcome)
+        return result.ok
+
+    dag = await run_dag(
+        dependencies,
+        run_step,
+        succeeded=[key for key, status in outcomes.items() if status == "succeeded"],
+        failed=[key for key, status in outcomes.items() if status in _FINAL_STEP_FAILURES],
+    )
+
+    pending = [outcomes[key] for key in dag.failed]
+    delay = 0.0
+    if not dag.failed:
+        outcome = "succeeded"
+    elif "retry_scheduled" in pending or "deferred" in pending:
+        outcome = "retry_scheduled"
+        if "retry_scheduled" in pending:
+            delay = backoff_delay(attempt, ctx.settings.retry_base_seconds, ctx.settings.retry_cap_seconds)
+        if waits:
+            # Spread like _defer so a recovering destination isn't hit at once.
+            delay = max(delay, max(waits) * (1 + random.random()))
+    elif "failed" in pending:
+        outcome = "failed"
+    else:
+        outcome = "dead_lettered"
+
+    failed_step = next((key for key in sorted(dag.failed) if errors.get(key)), None)
+    await ctx.writer.status(
+        job.run_id,
+        job.created_at,
+        outcome,
+        error=f"step {failed_step}: {errors[failed_step]}" if failed_step else None,
+        # Keep the error of an earlier attempt when this one added none.
+        set_error=failed_step is not None or not dag.failed,
+        delay_seconds=delay if outcome == "retry_scheduled" else None,
+        finished=outcome != "retry_scheduled",
+        # The claim counted an attempt; one that only deferred steps is not.
+        attempts_delta=0 if errors else -1,
+    )
+    if outcome == "retry_scheduled":
+        await ctx.retries.schedule(job.to_raw(), delay)
+    ctx.metrics.jobs.inc(outcome)
+
+    logger.info(
+        "run attempt finished",
+        extra={
+            "run_id": job.run_id,
+            "attempt": attempt,
+            "outcome": outcome,
+            "steps_succeeded": len(dag.succeeded),
+            "steps_failed": len(dag.failed),
+            "steps_blocked": len(dag.blocked),
+        },
+    )
+
+
+def _record_result(ctx: JobContext, host: str, result: ActionResult) -> None:
+    ctx.metrics.delivery_duration.observe(result.duration_ms / 1000)
+    # Only failures that say the destination is unhealthy count against its
+    # breaker; a 4xx means it is up and answering.
+    if not result.ok and is_retryable(result.status_code):
+        ctx.breakers.record_failure(host)
+    else:
+        ctx.breakers.record_success(host)
+
+
+def _attempt_outcome(result: ActionResult, attempt: int, max_attempts: int) -> str:
+    if result.ok:
+        return "succeeded"
+    if not is_retryable(result.status_code):
+        return "failed"
+    if attempt >= max_attempts:
+        return "dead_lettered"
+    return "retry_scheduled"
+
+
+async def _destination_wait(ctx: JobContext, host: str) -> float:
+    """Seconds until ``host`` may be called, or 0 to call it now.
+
+    Short rate-limit waits are absorbed in the slot; anything longer, and any
+    open breaker, is returned so the job can be deferred instead of holding
+    a slot that healthy destinations could use.
+    """
+    wait = ctx.breakers.before_request(host)
+    if wait > 0:
+        return wait
+    while (wait := await ctx.limiter.acquire(host)) > 0:
+        if wait > ctx.settings.destination_max_wait_seconds:
+            return wait
+        await asyncio.sleep(wait)
+    return 0.0
+
+
+async def _defer(ctx: JobContext, job: Job, host: str, wait: float) -> None:
+    # Spread deferred jobs over [wait, 2 * wait] so a recovering destination
+    # doesn't receive its whole backlog at once.
+    delay = wait * (1 + random.random())
+    # The claim already counted an attempt; a deferral is not one.
+    await ctx.writer.log(job.run_id, "info", f"deferred {delay:.1f}s: destination {host} is throttled or failing")
+    await ctx.writer.status(
+        job.run_id,
+        job.created_at,
+        "retry_scheduled",
+        set_error=False,
+        delay_seconds=delay,
+        attempts_delta=-1,
+    )
+    await ctx.retries.schedule(job.to_raw(), delay)
+    ctx.metrics.jobs.inc("deferred")
+    logger.info("run deferred for destination", extra={"run_id": job.run_id, "host": host, "delay": delay})
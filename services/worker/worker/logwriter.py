@@ -0,0 +1,292 @@
+import asyncio
+import json
+import logging
+from contextlib import suppress
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Each record kind is written with one statement per flush whatever the batch
+# size: rows travel as parallel arrays and are expanded with unnest.
+_INSERT_ATTEMPTS = text(
+    """
+    INSERT INTO delivery_attempts (run_id, step_key, attempt, status_code, duration_ms, error)
+    SELECT * FROM unnest(
+        CAST(:run_id AS uuid[]),
+        CAST(:step_key AS text[]),
+        CAST(:attempt AS integer[]),
+        CAST(:status_code AS integer[]),
+        CAST(:duration_ms AS integer[]),
+        CAST(:error AS text[])
+    )
+    """
+)
+
+_INSERT_LOGS = text(
+    """
+    INSERT INTO run_logs (run_id, level, message)
+    SELECT * FROM unnest(CAST(:run_id AS uuid[]), CAST(:level AS text[]), CAST(:message AS text[]))
+    """
+)
+
+_UPSERT_STEPS = text(
+    """
+    INSERT INTO run_steps AS s (run_id, created_at, step_key, status, attempts, status_code, last_error, output)
+    SELECT u.run_id, u.created_at, u.step_key, u.status, 1, u.status_code, u.error, u.output
+    FROM unnest(
+        CAST(:run_id AS uuid[]),
+        CAST(:created_at AS timestamptz[]),
+        CAST(:step_key AS text[]),
+        CAST(:status AS text[]),
+        CAST(:status_code AS integer[]),
+        CAST(:error AS text[]),
+        CAST(:output AS jsonb[])
+    ) AS u(run_id, created_at, step_key, status, status_code, error, output)
+    ON CONFLICT (run_id, created_at, step_key) DO UPDATE
+    SET status = EXCLUDED.status,
+        attempts = s.attempts + 1,
+        status_code = EXCLUDED.status_code,
+        last_error = EXCLUDED.last_error,
+        output = EXCLUDED.output,
+        updated_at = now()
+    """
+)
+
+_UPDATE_RUNS = text(
+    """
+    UPDATE runs AS r
+    SET status = u.status,
+        last_error = CASE WHEN u.set_error THEN u.error ELSE r.last_error END,
+        next_attempt_at = CASE
+            WHEN u.delay_seconds IS NULL THEN NULL
+            ELSE now() + make_interval(secs => u.delay_seconds)
+        END,
+        finished_at = CASE WHEN u.finished THEN now() ELSE r.finished_at END,
+        attempts = r.attempts + u.attempts_delta,
+        updated_at = now()
+    FROM unnest(
+        CAST(:run_id AS uuid[]),
+        CAST(:created_at AS timestamptz[]),
+        CAST(:status AS text[]),
+        CAST(:set_error AS boolean[]),
+        CAST(:error AS text[]),
+        CAST(:delay_seconds AS double precision[]),
+        CAST(:finished AS boolean[]),
+        CAST(:attempts_delta AS integer[])
+    ) AS u(run_id, created_at, status, set_error, error, delay_seconds, finished, attempts_delta)
+    WHERE r.id = u.run_id AND r.created_at = u.created_at
+    """
+)
+
+_STATEMENTS = {"attempt": _INSERT_ATTEMPTS, "log": _INSERT_LOGS, "step": _UPSERT_STEPS, "status": _UPDATE_RUNS}
+
+
+@dataclass
+class _Record:
+    kind: str
+    values: dict[str, Any]
+    done: asyncio.Future[None] | None = field(default=None)
+
+
+def _step_row(record: _Record) -> tuple[Any, ...]:
+    return (record.values["run_id"], record.values["created_at"], record.values["step_key"])
+
+
+class LogWriter:
+    """Buffers run status changes, step logs and delivery attempts.
+
+    Records are flushed in one transaction once ``batch_size`` are waiting or
+    ``flush_interval_seconds`` after the first one arrived. The buffer is
+    bounded: writers wait for room when the database falls behind rather
+    than growing memory without limit.
+
+    Status and step changes are awaited until their batch is committed:
+    the caller acknowledges the job after a status change, and a committed
+    step is not run again when the job is resumed. Logs and attempts are
+    queued ahead of the status change of the same job, so they are
+    committed no later than it.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        *,
+        max_buffer: int,
+        batch_size: int,
+        flush_interval_seconds: float,
+    ) -> None:
+        self.engine = engine
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self._queue: asyncio.Queue[_Record] = asyncio.Queue(maxsize=max_buffer)
+        self._has_items = asyncio.Event()
+        self._flush_now = asyncio.Event()
+        self._closing = False
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="log-writer")
+
+    async def aclose(self) -> None:
+        """Flush everything still buffered and stop the writer."""
+        self._closing = True
+        self._has_items.set()
+        self._flush_now.set()
+        if self._task is not None:
+            await self._task
+
+    async def attempt(
+        self,
+        run_id: str,
+        attempt: int,
+        status_code: int | None,
+        duration_ms: int,
+        error: str | None,
+        *,
+        step_key: str | None = None,
+    ) -> None:
+        await self._put(
+            _Record(
+                "attempt",
+                {
+                    "run_id": run_id,
+                    "step_key": step_key,
+                    "attempt": attempt,
+                    "status_code": status_code,
+                    "duration_ms": duration_ms,
+                    "error": error,
+                },
+            )
+        )
+
+    async def log(self, run_id: str, level: str, message: str) -> None:
+        await self._put(_Record("log", {"run_id": run_id, "level": level, "message": message}))
+
+    async def step(
+        self,
+        run_id: str,
+        created_at: str,
+        step_key: str,
+        status: str,
+        *,
+        status_code: int | None = None,
+        error: str | None = None,
+        output: Any = None,
+    ) -> None:
+        """Record the outcome of one workflow step and wait until it is committed."""
+        await self._put_and_wait(
+            "step",
+            {
+                "run_id": run_id,
+                "created_at": created_at,
+                "step_key": step_key,
+                "status": status,
+                "status_code": status_code,
+                "error": error,
+                "output": None if output is None else json.dumps(output),
+            },
+        )
+
+    async def status(
+        self,
+        run_id: str,
+        created_at: str,
+        status: str,
+        *,
+        error: str | None = None,
+        set_error: bool = True,
+        delay_seconds: float | None = None,
+        finished: bool = False,
+        attempts_delta: int = 0,
+    ) -> None:
+        """Record a run status change and wait until it is committed."""
+        await self._put_and_wait(
+            "status",
+            {
+                "run_id": run_id,
+                "created_at": created_at,
+                "status": status,
+                "set_error": set_error,
+                "error": error,
+                "delay_seconds": delay_seconds,
+                "finished": finished,
+                "attempts_delta": attempts_delta,
+            },
+        )
+
+    def flush_soon(self) -> None:
+        """Flush whatever is buffered without waiting for a full batch."""
+        self._flush_now.set()
+
+    async def _run(self) -> None:
+        while not (self._closing and self._queue.empty()):
+            if self._queue.empty():
+                self._has_items.clear()
+                await self._has_items.wait()
+                continue
+            if not self._closing and self._queue.qsize() < self.batch_size:
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._flush_now.wait(), timeout=self.flush_interval_seconds)
+            self._flush_now.clear()
+            batch = [self._queue.get_nowait() for _ in range(min(self.batch_size, self._queue.qsize()))]
+            await self._flush(batch)
+
+    async def _put_and_wait(self, kind: str, values: dict[str, Any]) -> None:
+        done: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        await self._put(_Record(kind, values, done))
+        await done
+
+    async def _put(self, record: _Record) -> None:
+        if self._task is not None and self._task.done():
+            raise RuntimeError("log writer is not running")
+        await self._queue.put(record)
+        self._has_items.set()
+        if self._queue.qsize() >= self.batch_size:
+            self._flush_now.set()
+
+    async def _flush(self, batch: list[_Record]) -> None:
+        # Any failure ends up on the batch's waiters: if it escaped, the
+        # writer task would die and every later status change would hang.
+        error: Exception | None = None
+        try:
+            await self._write(batch)
+        except Exception as exc:
+            error = exc
+            logger.error("dropping unflushable log records", extra={"records": len(batch)}, exc_info=True)
+        for record in batch:
+            if record.done is not None and not record.done.done():
+                if error is None:
+                    record.done.set_result(None)
+                else:
+                    record.done.set_exception(error)
+
+    async def _write(self, batch: list[_Record]) -> None:
+        # An upsert may not touch the same row twice, so only the last change
+        # of a step within the batch is written.
+        last_step = {_step_row(record): record for record in batch if record.kind == "step"}
+        columns: dict[str, dict[str, list[Any]]] = {}
+        for record in batch:
+            if record.kind == "step" and last_step[_step_row(record)] is not record:
+                continue
+            kind_columns = columns.setdefault(record.kind, {})
+            for name, value in record.values.items():
+                kind_columns.setdefault(name, []).append(value)
+
+        retry_delays = (0.1, 0.5)
+        for retry in range(len(retry_delays) + 1):
+            try:
+                async with self.engine.begin() as conn:
+                    for kind in ("attempt", "log", "step", "status"):
+                        if kind in columns:
+                            await conn.execute(_STATEMENTS[kind], columns[kind])
+                return
+            except SQLAlchemyError:
+                if retry == len(retry_delays):
+                    raise
+                logger.warning("log flush failed", extra={"records": len(batch)}, exc_info=True)
+                await asyncio.sleep(retry_delays[retry])
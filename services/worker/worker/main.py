@@ -1,27 +1,235 @@
+import asyncio
 import logging
 import signal
 import time
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
-logger = logging.getLogger(__name__)
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+from sqlalchemy.exc import SQLAlchemyError
+
+from danux_shared.cipher import PayloadCipher
+from danux_shared.redaction import (
+    SENSITIVE_KEY_WORDS,
+    SENSITIVE_VALUE_PATTERNS,
+    Redactor,
+    install_log_redaction,
+)
+from worker.breaker import CircuitBreakers
+from worker.config import Settings, get_settings
+from worker.db import create_engine
+from worker.http import create_session
+from worker.instrumentation import WorkerMetrics, serve_metrics
+from worker.jobs import Job, JobContext, dead_letter_runs, handle_job
+from worker.logwriter import LogWriter
+from worker.maintenance import maintain_partitions, requeue_stranded_runs
+from worker.queue import Delivery, StreamConsumer, default_consumer_name
+from worker.ratelimit import SharedRateLimiter
+from worker.scheduler import RetryScheduler, run_scheduler
 
-RUNNING = True
+logger = logging.getLogger(__name__)
 
 
-def _handle_stop(signum: int, _frame: object) -> None:
-    global RUNNING
+def _handle_stop(signum: int, stop: asyncio.Event, writer: LogWriter) -> None:
     logger.info("worker shutdown signal received", extra={"signal": signum})
-    RUNNING = False
+    # Push out buffered records right away; whatever the draining jobs still
+    # write is flushed by writer.aclose() before the process exits.
+    writer.flush_soon()
+    stop.set()
 
 
-def main() -> None:
-    signal.signal(signal.SIGTERM, _handle_stop)
-    signal.signal(signal.SIGINT, _handle_stop)
-    logger.info("worker started (placeholder, no jobs yet)")
-    while RUNNING:
-        time.sleep(1)
+async def _fetch(
+    consumer: StreamConsumer,
+    buffer: "asyncio.Queue[Delivery | None]",
+    settings: Settings,
+    stop: asyncio.Event,
+) -> None:
+    # Prefetch in batches so one XREADGROUP round trip feeds several slots.
+    # The bounded buffer keeps this consumer from reserving more entries than
+    # it can start soon; anything it does reserve is recoverable by
+    # claim_stalled if this process dies.
+    while not stop.is_set():
+        try:
+            deliveries = await consumer.read(settings.queue_batch_size, settings.queue_block_ms)
+        except RedisError:
+            logger.exception("queue read failed")
+            await asyncio.sleep(1)
+            continue
+        for delivery in deliveries:
+            await buffer.put(delivery)
+
+
+async def _reclaim(
+    consumer: StreamConsumer,
+    buffer: "asyncio.Queue[Delivery | None]",
+    settings: Settings,
+    stop: asyncio.Event,
+) -> None:
+    while not stop.is_set():
+        try:
+            for delivery in await consumer.claim_stalled(settings.queue_batch_size):
+                await buffer.put(delivery)
+            await consumer.prune_consumers(settings.queue_consumer_expiry_ms)
+        except (RedisError, SQLAlchemyError):
+            logger.exception("stalled job recovery failed")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=settings.queue_claim_interval_seconds)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def _consume(
+    slot: int,
+    ctx: JobContext,
+    consumer: StreamConsumer,
+    buffer: "asyncio.Queue[Delivery | None]",
+) -> None:
+    # Slots keep draining the buffer after shutdown starts and exit on the
+    # sentinel, so every entry this process already reserved gets run.
+    metrics = ctx.metrics
+    while (delivery := await buffer.get()) is not None:
+        try:
+            job = Job.from_raw(delivery.fields.get(b"job"))
+        except ValueError:
+            metrics.jobs.inc("malformed")
+            logger.warning("discarding malformed job", extra={"slot": slot, "message_id": delivery.message_id})
+            await consumer.ack(delivery.message_id)
+            continue
+        metrics.queue_latency.observe(max(0.0, time.time() - delivery.enqueued_at))
+        metrics.running += 1
+        started = time.perf_counter()
+        try:
+            await handle_job(ctx, job)
+        except Exception:
+            metrics.jobs.inc("error")
+            # Left unacknowledged: another consumer reclaims it once idle.
+            logger.exception("job failed", extra={"slot": slot, "run_id": job.run_id})
+            continue
+        finally:
+            metrics.running -= 1
+            metrics.job_duration.observe(time.perf_counter() - started)
+        try:
+            await consumer.ack(delivery.message_id)
+        except RedisError:
+            logger.exception("job ack failed", extra={"slot": slot, "run_id": job.run_id})
+
+
+async def run(settings: Settings) -> None:
+    stop = asyncio.Event()
+    engine = create_engine(settings)
+    writer = LogWriter(
+        engine,
+        max_buffer=settings.log_buffer_size,
+        batch_size=settings.log_batch_size,
+        flush_interval_seconds=settings.log_flush_interval_seconds,
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, _handle_stop, sig, stop, writer)
+
+    client = redis.from_url(settings.redis_url)
+    consumer = StreamConsumer(
+        client,
+        settings.queue_stream,
+        settings.queue_group,
+        default_consumer_name(),
+        claim_idle_ms=settings.queue_claim_idle_ms,
+        max_deliveries=settings.queue_max_deliveries,
+        on_dead_letter=lambda deliveries: dead_letter_runs(engine, deliveries, settings.queue_max_deliveries),
+    )
+    retries = RetryScheduler(client, settings)
+    metrics = WorkerMetrics()
+    buffer: asyncio.Queue[Delivery | None] = asyncio.Queue(maxsize=settings.worker_concurrency)
+    writer.start()
+    try:
+        await consumer.ensure_group()
+        async with create_session(settings) as http:
+            ctx = JobContext(
+                engine=engine,
+                http=http,
+                retries=retries,
+                limiter=SharedRateLimiter(
+                    client,
+                    rate_per_second=settings.destination_rate_per_second,
+                    burst=settings.destination_burst,
+                    lease_size=settings.destination_lease_size,
+                    lease_seconds=settings.destination_lease_seconds,
+                    overrides=settings.destination_rate_overrides,
+                ),
+                breakers=CircuitBreakers(
+                    failure_threshold=settings.breaker_failure_threshold,
+                    open_seconds=settings.breaker_open_seconds,
+                ),
+                request_slots=asyncio.Semaphore(settings.worker_concurrency),
+                writer=writer,
+                metrics=metrics,
+                settings=settings,
+                cipher=PayloadCipher(settings.app_encryption_key),
+            )
+            metrics.watch(
+                engine,
+                client,
+                http,
+                dead_lettered=lambda: consumer.dead_lettered,
+                promoted=lambda: retries.promoted,
+            )
+
+            async def refresh_metrics() -> None:
+                metrics.retry_backlog.set(await client.zcard(settings.retry_key))
+
+            metrics_server = None
+            if settings.metrics_port:
+                metrics_server = await serve_metrics(
+                    metrics, settings.metrics_host, settings.metrics_port, refresh_metrics
+                )
+            background = [
+                asyncio.create_task(_fetch(consumer, buffer, settings, stop), name="queue-fetch"),
+                asyncio.create_task(_reclaim(consumer, buffer, settings, stop), name="queue-reclaim"),
+                asyncio.create_task(run_scheduler(retries, settings, stop), name="retry-scheduler"),
+                asyncio.create_task(maintain_partitions(engine, settings, stop), name="partition-maintenance"),
+                asyncio.create_task(
+                    requeue_stranded_runs(engine, client, consumer, settings, stop), name="stranded-run-sweep"
+                ),
+            ]
+            slots = [
+                asyncio.create_task(_consume(slot, ctx, consumer, buffer), name=f"job-slot-{slot}")
+                for slot in range(settings.worker_concurrency)
+            ]
+            logger.info(
+                "worker started",
+                extra={"concurrency": settings.worker_concurrency, "consumer": consumer.consumer},
+            )
+
+            await stop.wait()
+            await asyncio.gather(*background, return_exceptions=True)
+            for _ in slots:
+                await buffer.put(None)
+            _, pending = await asyncio.wait(slots, timeout=settings.shutdown_grace_seconds)
+            if pending:
+                logger.warning("cancelling jobs still running after grace period", extra={"count": len(pending)})
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+            if metrics_server is not None:
+                metrics_server.close()
+                await metrics_server.wait_closed()
+    finally:
+        await writer.aclose()
+        await client.aclose()
+        await engine.dispose()
     logger.info("worker stopped")
 
 
+def main() -> None:
+    settings = get_settings()
+    install_log_redaction(
+        Redactor(
+            key_words=[*SENSITIVE_KEY_WORDS, *settings.redaction_extra_keys],
+            value_patterns=[*SENSITIVE_VALUE_PATTERNS, *settings.redaction_extra_patterns],
+        ),
+        settings.log_level,
+    )
+    asyncio.run(run(settings))
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from danux_shared.envelope import encode_job
+from worker.config import Settings
+from worker.queue import StreamConsumer
+
+logger = logging.getLogger(__name__)
+
+_ENSURE_PARTITIONS = text("SELECT danux_ensure_partitions(:days_ahead)")
+_DROP_PARTITIONS = text("SELECT danux_drop_partitions(:retain_days)")
+
+# 'retry_scheduled' runs are only remembered by the delayed-retry set in
+# Redis, which a Redis restart empties; one whose retry is overdue is
+# treated like a 'queued' run whose entry never arrived.
+#
+# Touching updated_at keeps a requeued run out of the next sweeps until it
+# is stale again, and SKIP LOCKED keeps concurrent sweepers off each other's
+# rows, so a stranded run is put back once rather than once per worker.
+_TAKE_STRANDED_RUNS = text(
+    """
+    UPDATE runs AS r
+    SET updated_at = now()
+    FROM (
+        SELECT id, created_at
+        FROM runs
+        WHERE updated_at < :before
+          AND (
+              (status = 'queued' AND created_at < :before)
+              OR (status = 'retry_scheduled' AND next_attempt_at < :before)
+          )
+        ORDER BY created_at
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    ) AS s
+    WHERE r.id = s.id AND r.created_at = s.created_at
+    RETURNING r.id, r.created_at
+    """
+)
+
+
+async def maintain_partitions(engine: AsyncEngine, settings: Settings, stop: asyncio.Event) -> None:
+    """Keep daily partitions created ahead of time and drop expired ones.
+
+    Every worker runs this loop; the SQL functions serialise on an advisory
+    lock, so concurrent calls are harmless.
+    """
+    while not stop.is_set():
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(_ENSURE_PARTITIONS, {"days_ahead": settings.partition_days_ahead})
+                if settings.runs_retention_days > 0:
+                    dropped = (
+                        await conn.execute(_DROP_PARTITIONS, {"retain_days": settings.runs_retention_days})
+                    ).scalar()
+                    if dropped:
+                        logger.info("dropped expired partitions", extra={"count": dropped})
+        except SQLAlchemyError:
+            logger.exception("partition maintenance failed")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=settings.partition_maintenance_interval_seconds)
+        except asyncio.TimeoutError:
+            pass
+
+
+def stranded_before(
+    now: float, undelivered_since: float | None, claim_idle_seconds: float, grace_seconds: float
+) -> float:
+    """Creation time before which a 'queued' run cannot still be on its way.
+
+    A run older than the oldest undelivered stream entry would have been
+    delivered by now if its entry existed, and one older than the claim idle
+    time would have been reclaimed from a dead consumer; the grace covers
+    the gap between committing a run and adding its entry.
+    """
+    horizon = now if undelivered_since is None else min(now, undelivered_since)
+    return min(horizon, now - claim_idle_seconds) - grace_seconds
+
+
+async def requeue_stranded_runs(
+    engine: AsyncEngine,
+    client: redis.Redis,
+    consumer: StreamConsumer,
+    settings: Settings,
+    stop: asyncio.Event,
+) -> None:
+    """Put runs back on the stream whose entry never made it there.
+
+    The API commits a run before adding its stream entry; if that XADD fails
+    the sender's retry is answered as a duplicate, so without this sweep the
+    run would stay 'queued' forever. Likewise a parked retry lost with the
+    delayed-retry set would stay 'retry_scheduled' forever.
+    """
+    while not stop.is_set():
+        try:
+            before = stranded_before(
+                time.time(),
+                await consumer.undelivered_since(),
+                settings.queue_claim_idle_ms / 1000,
+                settings.queue_requeue_grace_seconds,
+            )
+            async with engine.begin() as conn:
+                runs = (
+                    await conn.execute(
+                        _TAKE_STRANDED_RUNS,
+                        {
+                            "before": datetime.fromtimestamp(before, timezone.utc),
+                            "limit": settings.queue_requeue_batch_size,
+                        },
+                    )
+                ).all()
+            if runs:
+                async with client.pipeline(transaction=False) as pipe:
+                    for run in runs:
+                        pipe.xadd(
+                            settings.queue_stream,
+                            {"job": encode_job(str(run.id), run.created_at)},
+                            maxlen=settings.queue_maxlen,
+                            approximate=True,
+                        )
+                    await pipe.execute()
+                logger.warning("requeued stranded runs", extra={"count": len(runs)})
+        except (SQLAlchemyError, RedisError):
+            logger.exception("stranded run sweep failed")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=settings.queue_requeue_interval_seconds)
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,15 @@
+import zstandard
+
+from danux_shared.cipher import PayloadCipher
+
+_DECOMPRESSOR = zstandard.ZstdDecompressor()
+
+
+def open_delivery(codec: str, data: bytes, cipher: PayloadCipher) -> bytes:
+    """Recover the request body a run was created from, byte for byte."""
+    body = cipher.open(data)
+    if codec == "zstd":
+        return _DECOMPRESSOR.decompress(body)
+    if codec != "identity":
+        raise ValueError(f"unknown_payload_codec:{codec}")
+    return body
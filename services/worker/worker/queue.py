@@ -0,0 +1,154 @@
+import logging
+import os
+import socket
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+import redis.asyncio as redis
+from redis.exceptions import ResponseError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Delivery:
+    message_id: str
+    fields: dict[bytes, bytes]
+
+    @property
+    def enqueued_at(self) -> float:
+        """Unix time the entry was added, read from its stream id."""
+        return int(self.message_id.split("-", 1)[0]) / 1000
+
+
+def default_consumer_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class StreamConsumer:
+    """Consumer-group reader for the run queue stream.
+
+    Entries stay in the group's pending list until ``ack`` is called, so a
+    worker that dies mid-job leaves its deliveries behind for ``claim_stalled``
+    on another worker to pick up.
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        stream: str,
+        group: str,
+        consumer: str,
+        *,
+        claim_idle_ms: int,
+        max_deliveries: int,
+        on_dead_letter: Callable[[list[Delivery]], Awaitable[None]] | None = None,
+    ) -> None:
+        self.client = client
+        self.stream = stream
+        self.group = group
+        self.consumer = consumer
+        self.claim_idle_ms = claim_idle_ms
+        self.max_deliveries = max_deliveries
+        self.on_dead_letter = on_dead_letter
+        self._claim_cursor = "0-0"
+        self.dead_lettered = 0
+
+    async def ensure_group(self) -> None:
+        try:
+            await self.client.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    async def read(self, count: int, block_ms: int) -> list[Delivery]:
+        response = await self.client.xreadgroup(
+            self.group, self.consumer, {self.stream: ">"}, count=count, block=block_ms
+        )
+        if not response:
+            return []
+        _, entries = response[0]
+        return [Delivery(message_id=_decode(message_id), fields=fields) for message_id, fields in entries]
+
+    async def ack(self, *message_ids: str) -> None:
+        if message_ids:
+            await self.client.xack(self.stream, self.group, *message_ids)
+
+    async def claim_stalled(self, count: int) -> list[Delivery]:
+        """Take over deliveries that another consumer left idle for too long.
+
+        Entries already delivered ``max_deliveries`` times are moved to the
+        dead stream instead of being handed out again. ``on_dead_letter`` is
+        awaited first, so the entries stay pending, and are dead-lettered on
+        a later call, if recording the outcome elsewhere fails.
+        """
+        next_cursor, entries, *_ = await self.client.xautoclaim(
+            self.stream,
+            self.group,
+            self.consumer,
+            min_idle_time=self.claim_idle_ms,
+            start_id=self._claim_cursor,
+            count=count,
+        )
+        self._claim_cursor = _decode(next_cursor)
+        claimed = [
+            Delivery(message_id=_decode(message_id), fields=fields)
+            for message_id, fields in entries
+            if fields is not None
+        ]
+        if not claimed:
+            return []
+
+        # One exact-id lookup per entry: a range query over the claimed ids
+        # could also match this consumer's own in-flight entries between them
+        # and push claimed ones past the count limit.
+        async with self.client.pipeline(transaction=False) as pipe:
+            for delivery in claimed:
+                pipe.xpending_range(
+                    self.stream, self.group, min=delivery.message_id, max=delivery.message_id, count=1
+                )
+            pending = await pipe.execute()
+        times_delivered = {
+            delivery.message_id: items[0]["times_delivered"] if items else 0
+            for delivery, items in zip(claimed, pending)
+        }
+        poisoned = [d for d in claimed if times_delivered.get(d.message_id, 0) > self.max_deliveries]
+        if poisoned:
+            await self._dead_letter(poisoned)
+        poisoned_ids = {d.message_id for d in poisoned}
+        return [d for d in claimed if d.message_id not in poisoned_ids]
+
+    async def undelivered_since(self) -> float | None:
+        """Unix time of the oldest entry not yet delivered to the group, or None."""
+        for info in await self.client.xinfo_groups(self.stream):
+            if _decode(info["name"]) == self.group:
+                first = await self.client.xrange(
+                    self.stream, min=f"({_decode(info['last-delivered-id'])}", count=1
+                )
+                return Delivery(message_id=_decode(first[0][0]), fields={}).enqueued_at if first else None
+        return None
+
+    async def prune_consumers(self, idle_ms: int) -> None:
+        """Drop consumers of replaced worker containers once they own no entries."""
+        for info in await self.client.xinfo_consumers(self.stream, self.group):
+            name = _decode(info["name"])
+            if name != self.consumer and info["pending"] == 0 and info["idle"] > idle_ms:
+                await self.client.xgroup_delconsumer(self.stream, self.group, name)
+
+    async def _dead_letter(self, deliveries: list[Delivery]) -> None:
+        if self.on_dead_letter is not None:
+            await self.on_dead_letter(deliveries)
+        async with self.client.pipeline(transaction=True) as pipe:
+            for delivery in deliveries:
+                pipe.xadd(f"{self.stream}:dead", {**delivery.fields, b"message_id": delivery.message_id})
+                pipe.xack(self.stream, self.group, delivery.message_id)
+            await pipe.execute()
+        self.dead_lettered += len(deliveries)
+        logger.warning(
+            "dead-lettered queue entries after repeated delivery",
+            extra={"message_ids": [d.message_id for d in deliveries]},
+        )
+
+
+def _decode(value: bytes | str) -> str:
+    return value.decode() if isinstance(value, bytes) else value
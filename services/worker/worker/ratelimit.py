@@ -0,0 +1,73 @@
+import time
+
+import redis.asyncio as redis
+
+# Token bucket shared by every worker. Grants up to ARGV[3] tokens at once
+# and returns {granted, ms until the next token}. Redis' own clock is used
+# so that workers with skewed clocks still refill the bucket consistently.
+_TAKE_TOKENS = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local wanted = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local last = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - last) * rate / 1000)
+local granted = math.min(wanted, math.floor(tokens))
+tokens = tokens - granted
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst * 1000 / rate) + 1000)
+local wait = 0
+if granted == 0 then
+    wait = math.ceil((1 - tokens) * 1000 / rate)
+end
+return {granted, wait}
+"""
+
+
+class SharedRateLimiter:
+    """Per-destination request rate limit shared across worker processes.
+
+    Tokens are leased from the Redis bucket in small batches and spent
+    locally, so most requests are admitted without a Redis round trip. A
+    lease expires after ``lease_seconds`` to keep idle processes from
+    sitting on tokens another worker could use.
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        rate_per_second: float,
+        burst: int,
+        lease_size: int,
+        lease_seconds: float,
+        overrides: dict[str, float] | None = None,
+    ) -> None:
+        self.client = client
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.lease_size = max(1, min(lease_size, burst))
+        self.lease_seconds = lease_seconds
+        self.overrides = overrides or {}
+        self._leases: dict[str, tuple[int, float]] = {}
+        self._take = client.register_script(_TAKE_TOKENS)
+
+    async def acquire(self, host: str) -> float:
+        """Take one token for ``host``; return 0 on success, else seconds to wait."""
+        now = time.monotonic()
+        tokens, expires_at = self._leases.get(host, (0, 0.0))
+        if tokens > 0 and now < expires_at:
+            self._leases[host] = (tokens - 1, expires_at)
+            return 0.0
+
+        rate = self.overrides.get(host, self.rate_per_second)
+        granted, wait_ms = await self._take(
+            keys=[f"danux:ratelimit:{host}"], args=[rate, self.burst, self.lease_size]
+        )
+        if granted > 0:
+            self._leases[host] = (int(granted) - 1, now + self.lease_seconds)
+            return 0.0
+        self._leases.pop(host, None)
+        return int(wait_ms) / 1000
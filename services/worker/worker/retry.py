@@ -0,0 +1,29 @@
+import random
+from typing import Callable
+
+
+def backoff_delay(
+    attempt: int,
+    base_seconds: float,
+    cap_seconds: float,
+    rng: Callable[[], float] = random.random,
+) -> float:
+    """Full-jitter exponential backoff for the retry after ``attempt``.
+
+    The delay is drawn uniformly from ``[0, min(cap, base * 2 ** (attempt - 1))]``,
+    which spreads retries of runs that failed together instead of sending
+    them back to a recovering endpoint in lockstep.
+    """
+    ceiling = min(cap_seconds, base_seconds * 2 ** max(attempt - 1, 0))
+    return rng() * ceiling
+
+
+def is_retryable(status_code: int | None) -> bool:
+    """Whether a failed delivery is worth retrying.
+
+    Network errors and timeouts (no status), throttling and server errors
+    are transient; any other client error will fail the same way again.
+    """
+    if status_code is None:
+        return True
+    return status_code in (408, 425, 429) or status_code >= 500
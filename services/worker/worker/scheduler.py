@@ -0,0 +1,64 @@
+import asyncio
+import logging
+import time
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+from worker.config import Settings
+
+logger = logging.getLogger(__name__)
+
+# Moves up to ARGV[2] jobs due by ARGV[1] from the delayed set onto the run
+# stream. Running it as one script keeps promotion atomic, so every worker
+# can run the scheduler loop without promoting a job twice.
+_PROMOTE_DUE = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, job in ipairs(due) do
+    redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[3], '*', 'job', job)
+end
+if #due > 0 then
+    redis.call('ZREM', KEYS[1], unpack(due))
+end
+return #due
+"""
+
+
+class RetryScheduler:
+    """Parks jobs in a sorted set scored by due time until they may run again.
+
+    A failed run releases its worker slot immediately; the scheduler loop
+    puts it back on the stream once its backoff has elapsed.
+    """
+
+    def __init__(self, client: redis.Redis, settings: Settings) -> None:
+        self.client = client
+        self.key = settings.retry_key
+        self.stream = settings.queue_stream
+        self.maxlen = settings.queue_maxlen
+        self._promote = client.register_script(_PROMOTE_DUE)
+        self.promoted = 0
+
+    async def schedule(self, raw_job: bytes, delay_seconds: float) -> None:
+        await self.client.zadd(self.key, {raw_job: time.time() + delay_seconds})
+
+    async def promote_due(self, batch_size: int) -> int:
+        promoted = int(await self._promote(keys=[self.key, self.stream], args=[time.time(), batch_size, self.maxlen]))
+        self.promoted += promoted
+        return promoted
+
+
+async def run_scheduler(scheduler: RetryScheduler, settings: Settings, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        try:
+            promoted = await scheduler.promote_due(settings.retry_promote_batch_size)
+        except RedisError:
+            logger.exception("retry promotion failed")
+            promoted = 0
+        # A full batch means more jobs are probably due; keep going.
+        if promoted >= settings.retry_promote_batch_size:
+            continue
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=settings.retry_poll_seconds)
+        except asyncio.TimeoutError:
+            pass
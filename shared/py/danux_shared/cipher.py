@@ -0,0 +1,40 @@
+import hashlib
+import os
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+# Sealed values are a format version byte, a random 12-byte nonce and the
+# AES-256-GCM ciphertext with its tag. The version byte leaves room for
+# key rotation without rewriting stored values.
+CIPHER_VERSION = 1
+
+_NONCE_BYTES = 12
+
+
+class PayloadCipher:
+    """Encrypts payloads at rest with a key derived from APP_ENCRYPTION_KEY.
+
+    The configured secret is hashed to the 32-byte AES key, so any string of
+    enough entropy can be used as-is.
+    """
+
+    def __init__(self, secret: str) -> None:
+        if not secret:
+            raise ValueError("empty_encryption_key")
+        self._aead = AESGCM(hashlib.sha256(secret.encode("utf-8")).digest())
+        self._version = bytes([CIPHER_VERSION])
+
+    def seal(self, data: bytes) -> bytes:
+        nonce = os.urandom(_NONCE_BYTES)
+        return self._version + nonce + self._aead.encrypt(nonce, data, self._version)
+
+    def open(self, sealed: bytes) -> bytes:
+        """Decrypt a sealed value; raises ValueError if it was not sealed with this key."""
+        if sealed[:1] != self._version:
+            raise ValueError("unknown_cipher_version")
+        nonce = sealed[1 : 1 + _NONCE_BYTES]
+        try:
+            return self._aead.decrypt(nonce, sealed[1 + _NONCE_BYTES :], self._version)
+        except InvalidTag as exc:
+            raise ValueError("invalid_sealed_payload") from exc
@@ -0,0 +1,27 @@
+import struct
+from datetime import datetime, timedelta, timezone
+
+# Run queue entries and delayed retries carry a fixed-size binary envelope:
+# a format version byte, the run id as 16 raw bytes and the run's
+# created_at as microseconds since the Unix epoch. Together the two ids
+# address the run row, which in turn references its payload snapshot.
+ENVELOPE_VERSION = 1
+
+_V1 = struct.Struct(">B16sq")
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def encode_job(run_id: str, created_at: datetime) -> bytes:
+    # Plain hex handling is several times cheaper than going through uuid.UUID.
+    run_id_bytes = bytes.fromhex(run_id.replace("-", ""))
+    return _V1.pack(ENVELOPE_VERSION, run_id_bytes, (created_at - _EPOCH) // _MICROSECOND)
+
+
+def decode_job(raw: bytes) -> tuple[str, datetime]:
+    """Return the run id and created_at of an envelope; ValueError if malformed."""
+    if len(raw) != _V1.size or raw[0] != ENVELOPE_VERSION:
+        raise ValueError("invalid_job")
+    _, run_id_bytes, micros = _V1.unpack(raw)
+    h = run_id_bytes.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}", _EPOCH + timedelta(microseconds=micros)
@@ -0,0 +1,188 @@
+import math
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Iterator
+from typing import TypeVar
+
+# Upper bounds in seconds for request and job latencies.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Labels = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+
+_M = TypeVar("_M", bound=_Metric)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Labels = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def set_total(self, value: float, *labels: str) -> None:
+        """Mirror a count kept elsewhere, such as a component's stats object."""
+        self._values[labels] = value
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in list(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Labels = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[Labels, float] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in list(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class _Series:
+    __slots__ = ("counts", "total")
+
+    def __init__(self, size: int) -> None:
+        # One count per finite bucket plus the +Inf bucket, not cumulative.
+        self.counts = [0] * size
+        self.total = 0.0
+
+
+class Histogram(_Metric):
+    """Bucketed latency distribution.
+
+    ``observe`` bumps one bucket found by bisection; bucket counts are only
+    made cumulative when the histogram is rendered or queried.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Labels = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[Labels, _Series] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = _Series(len(self.buckets) + 1)
+        series.counts[bisect_left(self.buckets, value)] += 1
+        series.total += value
+
+    def quantile(self, q: float, *labels: str) -> float:
+        """Estimate the q-quantile by interpolating within its bucket."""
+        series = self._series.get(labels)
+        count = sum(series.counts) if series is not None else 0
+        if series is None or count == 0:
+            return math.nan
+        rank = q * count
+        seen = 0
+        for index, bucket_count in enumerate(series.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                return lower + (self.buckets[index] - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def samples(self) -> Iterator[str]:
+        names = (*self.labelnames, "le")
+        for labels, series in list(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, math.inf), list(series.counts)):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket{_format_labels(names, (*labels, _format_value(bound)))} {cumulative}"
+            label_text = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_text} {_format_value(series.total)}"
+            yield f"{self.name}_count{label_text} {cumulative}"
+
+
+class Registry:
+    """Holds a process's metrics and renders them in the Prometheus text format.
+
+    Metrics are updated from the event loop thread only, so updates are plain
+    dict and list operations with no locks on the hot path. Values that are
+    cheaper to read than to track, such as pool usage, are set by collect
+    callbacks run just before rendering.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Callable[[], None]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Labels = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Labels = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Labels = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def on_collect(self, callback: Callable[[], None]) -> None:
+        self._collectors.append(callback)
+
+    def render(self) -> str:
+        for callback in self._collectors:
+            callback()
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: _M) -> _M:
+        self._metrics.append(metric)
+        return metric
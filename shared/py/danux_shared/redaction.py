@@ -0,0 +1,182 @@
+import logging
+import re
+from collections.abc import Iterable
+from typing import Any
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s %(message)s"
+
+REDACTED = "[REDACTED]"
+
+# Matched against keys as whole words separated by "-", "_", "." or a
+# camelCase hump, so "access_token", "x-api-key" and "apiKey" are caught but
+# "tokens_used" is not.
+SENSITIVE_KEY_WORDS = (
+    "auth",
+    "authorization",
+    "credentials",
+    "cookie",
+    "password",
+    "passwd",
+    "secret",
+    "token",
+    "api_key",
+    "apikey",
+    "api-key",
+    "private_key",
+    "session",
+    "signature",
+)
+
+# Credentials that show up inside otherwise harmless strings and log lines.
+SENSITIVE_VALUE_PATTERNS = (
+    r"\b(?i:bearer|basic|token)\s+[A-Za-z0-9._~+/=-]{8,}",
+    r"\beyJ[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]*",
+    r"\b(?i:password|passwd|secret|token|api_key|apikey|access_token)=[^&\s\"']+",
+    r"(?<=://)[^/\s:@]+:[^/\s@]+(?=@)",
+)
+
+_KEY_CACHE_SIZE = 4096
+_CAMEL_HUMP_RE = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+
+
+class Redactor:
+    """Strips credentials from payload snapshots and log lines.
+
+    The key words and value patterns are compiled once into one regex each.
+    ``redact`` walks a decoded JSON document in a single pass and rebuilds
+    only the containers that actually change: untouched subtrees are
+    returned as the original objects, so a clean payload costs one walk and
+    no copies. Key decisions are memoised because payloads from the
+    same sender repeat the same keys on every event. With the built-in value
+    patterns only, strings without any of their literals skip the regex.
+    """
+
+    def __init__(
+        self,
+        key_words: Iterable[str] = SENSITIVE_KEY_WORDS,
+        value_patterns: Iterable[str] = SENSITIVE_VALUE_PATTERNS,
+    ) -> None:
+        words = sorted({word.lower() for word in key_words}, key=len, reverse=True)
+        self._key_re = re.compile(
+            r"(?:^|[-_.])(?:" + "|".join(re.escape(word) for word in words) + r")(?:$|[-_.])"
+        )
+        value_patterns = tuple(value_patterns)
+        self._value_re = re.compile("|".join(f"(?:{pattern})" for pattern in value_patterns))
+        self._prefilter = set(value_patterns) <= set(SENSITIVE_VALUE_PATTERNS)
+        self._key_cache: dict[str, bool] = {}
+
+    def is_sensitive_key(self, key: str) -> bool:
+        cached = self._key_cache.get(key)
+        if cached is None:
+            cached = self._key_re.search(_CAMEL_HUMP_RE.sub("_", key).lower()) is not None
+            if len(self._key_cache) >= _KEY_CACHE_SIZE:
+                self._key_cache.clear()
+            self._key_cache[key] = cached
+        return cached
+
+    def redact(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return self.redact_text(value)
+        if isinstance(value, dict):
+            return self._redact_dict(value)
+        if isinstance(value, list):
+            return self._redact_list(value)
+        return value
+
+    def redact_text(self, text: str) -> str:
+        if self._prefilter and not _has_value_hint(text):
+            return text
+        redacted, count = self._value_re.subn(REDACTED, text)
+        return redacted if count else text
+
+    def _redact_dict(self, value: dict[Any, Any]) -> dict[Any, Any]:
+        result: dict[Any, Any] | None = None
+        for key, item in value.items():
+            if isinstance(key, str) and self.is_sensitive_key(key):
+                new_item: Any = REDACTED
+            else:
+                new_item = self.redact(item)
+            if new_item is not item and result is None:
+                # First change: copy the entries seen so far, then keep going.
+                result = dict(value)
+            if result is not None:
+                result[key] = new_item
+        return value if result is None else result
+
+    def _redact_list(self, value: list[Any]) -> list[Any]:
+        result: list[Any] | None = None
+        for index, item in enumerate(value):
+            new_item = self.redact(item)
+            if new_item is not item and result is None:
+                result = list(value)
+            if result is not None:
+                result[index] = new_item
+        return value if result is None else result
+
+
+def _has_value_hint(text: str) -> bool:
+    """Whether ``text`` holds a literal that every built-in value pattern needs.
+
+    The check is an order of magnitude cheaper than the combined regex, and
+    most strings in a payload contain none of these literals.
+    """
+    if "=" in text or "://" in text or "eyJ" in text:
+        return True
+    lowered = text.lower()
+    return "bearer" in lowered or "basic" in lowered or "token" in lowered
+
+
+class RedactingFilter(logging.Filter):
+    """Logging filter that redacts the formatted message of each record.
+
+    Tracebacks and stack traces are formatted here too, into ``exc_text``,
+    and ``exc_info`` is cleared: a handler would otherwise format them after
+    the filter ran, from exception messages that can hold credentials.
+    """
+
+    _formatter = logging.Formatter()
+
+    def __init__(self, redactor: Redactor) -> None:
+        super().__init__()
+        self.redactor = redactor
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        message = record.getMessage()
+        redacted = self.redactor.redact_text(message)
+        if redacted != message:
+            record.msg = redacted
+            record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self._formatter.formatException(record.exc_info)
+            record.exc_info = None
+        if record.exc_text:
+            record.exc_text = self.redactor.redact_text(record.exc_text)
+        if record.stack_info:
+            record.stack_info = self.redactor.redact_text(record.stack_info)
+        return True
+
+
+def install_log_redaction(
+    redactor: Redactor, level: int | str = logging.INFO, logger_names: Iterable[str] = ()
+) -> None:
+    """Redact every record written by the root logger's and ``logger_names``' handlers.
+
+    The filter goes on handlers because a logger's own filters skip records
+    propagated from its children. Under uvicorn's default config the root
+    logger has no handler, so one is added; without it the service's records
+    would fall through to ``logging.lastResort`` unfiltered. Calling this
+    again replaces the previously installed filter.
+    """
+    root = logging.getLogger()
+    root.setLevel(level)
+    if not root.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        root.addHandler(handler)
+    log_filter = RedactingFilter(redactor)
+    for name in ("", *logger_names):
+        for handler in logging.getLogger(name).handlers:
+            for existing in [f for f in handler.filters if isinstance(f, RedactingFilter)]:
+                handler.removeFilter(existing)
+            handler.addFilter(log_filter)
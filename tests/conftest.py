@@ -0,0 +1,11 @@
+"""Fixtures shared by the API and worker tests."""
+from __future__ import annotations
+
+import pytest
+
+from tests.fakes import FakeClock
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
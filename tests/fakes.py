@@ -0,0 +1,12 @@
+"""Test doubles shared by the API and worker tests."""
+from __future__ import annotations
+
+
+class FakeClock:
+    """A monotonic clock that only moves when a test sets ``now``."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
@@ -0,0 +1,69 @@
+"""Tests for the API's ingest admission control."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services" / "api"))
+
+from app.services.admission import AdmissionController, QueueSample
+from tests.fakes import FakeClock
+
+
+def make_controller(**overrides: object) -> AdmissionController:
+    options: dict[str, object] = {
+        "max_queue_depth": 100,
+        "max_lag_seconds": 60.0,
+        "resume_ratio": 0.8,
+        "retry_after_seconds": 10,
+        "trigger_quotas": {},
+    }
+    options.update(overrides)
+    return AdmissionController(**options)  # type: ignore[arg-type]
+
+
+class TestAdmissionController:
+    def test_admits_before_first_sample(self) -> None:
+        assert make_controller().admit("orders") is None
+
+    def test_sheds_past_queue_depth_until_below_resume_ratio(self) -> None:
+        controller = make_controller()
+        controller.update(QueueSample(depth=100, lag_seconds=0.0))
+        assert controller.admit("orders") == 10
+
+        controller.update(QueueSample(depth=90, lag_seconds=0.0))
+        assert controller.admit("orders") == 10
+
+        controller.update(QueueSample(depth=79, lag_seconds=0.0))
+        assert controller.admit("orders") is None
+        assert controller.stats.shed_overload == 2
+        assert controller.stats.admitted == 1
+
+    def test_sheds_past_worker_lag(self) -> None:
+        controller = make_controller()
+        controller.update(QueueSample(depth=0, lag_seconds=61.0))
+        assert controller.admit("orders") == 10
+
+    def test_zero_limits_disable_checks(self) -> None:
+        controller = make_controller(max_queue_depth=0, max_lag_seconds=0.0)
+        controller.update(QueueSample(depth=10**9, lag_seconds=10**6))
+        assert controller.admit("orders") is None
+
+    def test_trigger_quota_refills_over_time(self, clock: FakeClock) -> None:
+        controller = make_controller(trigger_quotas={"orders": 2.0}, clock=clock)
+        assert controller.admit("orders") is None
+        assert controller.admit("orders") is None
+        assert controller.admit("orders") == 1
+        assert controller.admit("other") is None
+
+        clock.now = 0.5
+        assert controller.admit("orders") is None
+        assert controller.admit("orders") == 1
+        assert controller.stats.shed_quota == 2
+
+    def test_zero_quota_pauses_a_trigger(self) -> None:
+        controller = make_controller(trigger_quotas={"orders": 0.0})
+        assert controller.admit("orders") == 10
+        assert controller.admit("orders") == 10
+        assert controller.admit("other") is None
+        assert controller.stats.shed_quota == 2
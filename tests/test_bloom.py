@@ -0,0 +1,57 @@
+"""Tests for the API's idempotency bloom filters."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services" / "api"))
+
+from app.services.bloom import BloomFilter, TimeWindowedBloomFilter
+from tests.fakes import FakeClock
+
+
+class TestBloomFilter:
+    def test_added_keys_are_found(self) -> None:
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        keys = [f"wf:{i}" for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        assert all(key in bloom for key in keys)
+
+    def test_false_positive_rate_near_target(self) -> None:
+        bloom = BloomFilter(capacity=5000, error_rate=0.01)
+        for i in range(5000):
+            bloom.add(f"seen:{i}")
+        false_positives = sum(f"unseen:{i}" in bloom for i in range(20000))
+        assert false_positives / 20000 < 0.02
+
+    def test_invalid_parameters_raise(self) -> None:
+        with pytest.raises(ValueError, match="invalid_bloom_parameters"):
+            BloomFilter(capacity=0, error_rate=0.01)
+        with pytest.raises(ValueError, match="invalid_bloom_parameters"):
+            BloomFilter(capacity=10, error_rate=1.5)
+
+
+class TestTimeWindowedBloomFilter:
+    def test_key_survives_one_rotation(self, clock: FakeClock) -> None:
+        bloom = TimeWindowedBloomFilter(capacity=100, error_rate=0.01, window_seconds=60, clock=clock)
+        bloom.add("a")
+        clock.now = 61
+        assert "a" in bloom
+
+    def test_key_forgotten_after_two_windows(self, clock: FakeClock) -> None:
+        bloom = TimeWindowedBloomFilter(capacity=100, error_rate=0.01, window_seconds=60, clock=clock)
+        bloom.add("a")
+        clock.now = 61
+        assert "a" in bloom
+        clock.now = 122
+        assert "a" not in bloom
+
+    def test_rotates_when_generation_full(self, clock: FakeClock) -> None:
+        bloom = TimeWindowedBloomFilter(capacity=10, error_rate=0.01, window_seconds=3600, clock=clock)
+        for i in range(25):
+            bloom.add(f"k{i}")
+        assert "k24" in bloom
+        assert "k0" not in bloom
@@ -0,0 +1,67 @@
+"""Tests for the worker's per-destination circuit breakers."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services" / "worker"))
+
+from worker.breaker import CircuitBreakers
+from tests.fakes import FakeClock
+
+
+def _tripped(clock: FakeClock) -> CircuitBreakers:
+    breakers = CircuitBreakers(failure_threshold=3, open_seconds=30, probe_retry_seconds=1, clock=clock)
+    for _ in range(3):
+        breakers.record_failure("down.example")
+    return breakers
+
+
+class TestCircuitBreakers:
+    def test_closed_allows_requests(self) -> None:
+        breakers = CircuitBreakers(failure_threshold=3, open_seconds=30)
+        breakers.record_failure("a.example")
+        breakers.record_failure("a.example")
+        assert breakers.before_request("a.example") == 0.0
+
+    def test_opens_after_consecutive_failures(self, clock: FakeClock) -> None:
+        breakers = _tripped(clock)
+        clock.now = 10
+        assert breakers.before_request("down.example") == 20
+        assert breakers.before_request("up.example") == 0.0
+
+    def test_success_resets_failure_count(self) -> None:
+        breakers = CircuitBreakers(failure_threshold=3, open_seconds=30)
+        breakers.record_failure("a.example")
+        breakers.record_failure("a.example")
+        breakers.record_success("a.example")
+        breakers.record_failure("a.example")
+        assert breakers.before_request("a.example") == 0.0
+
+    def test_half_open_lets_one_probe_through(self, clock: FakeClock) -> None:
+        breakers = _tripped(clock)
+        clock.now = 30
+        assert breakers.before_request("down.example") == 0.0
+        assert breakers.before_request("down.example") == 1
+
+    def test_probe_success_closes(self, clock: FakeClock) -> None:
+        breakers = _tripped(clock)
+        clock.now = 30
+        breakers.before_request("down.example")
+        breakers.record_success("down.example")
+        assert breakers.before_request("down.example") == 0.0
+        assert breakers.before_request("down.example") == 0.0
+
+    def test_probe_failure_reopens(self, clock: FakeClock) -> None:
+        breakers = _tripped(clock)
+        clock.now = 30
+        breakers.before_request("down.example")
+        breakers.record_failure("down.example")
+        assert breakers.before_request("down.example") == 30
+
+    def test_lost_probe_is_replaced(self, clock: FakeClock) -> None:
+        breakers = _tripped(clock)
+        clock.now = 30
+        breakers.before_request("down.example")
+        clock.now = 60
+        assert breakers.before_request("down.example") == 0.0
@@ -0,0 +1,98 @@
+"""Tests for the worker's workflow step DAG scheduler."""
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services" / "worker"))
+
+from worker.dag import run_dag, topological_order
+
+# a -> b -> d and a -> c, with e independent of everything.
+GRAPH = {"a": (), "b": ("a",), "c": ("a",), "d": ("b",), "e": ()}
+
+
+class Recorder:
+    def __init__(self, fail: set[str] = frozenset(), delay: float = 0.01) -> None:
+        self.fail = fail
+        self.delay = delay
+        self.started: list[str] = []
+        self.running = 0
+        self.max_running = 0
+
+    async def __call__(self, key: str) -> bool:
+        self.started.append(key)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(self.delay)
+        self.running -= 1
+        return key not in self.fail
+
+
+class TestTopologicalOrder:
+    def test_dependencies_come_first(self) -> None:
+        order = topological_order(GRAPH)
+        assert sorted(order) == sorted(GRAPH)
+        for key, deps in GRAPH.items():
+            assert all(order.index(dep) < order.index(key) for dep in deps)
+
+    def test_rejects_cycles_and_unknown_steps(self) -> None:
+        with pytest.raises(ValueError, match="dependency_cycle"):
+            topological_order({"a": ("b",), "b": ("a",)})
+        with pytest.raises(ValueError, match="unknown_dependency"):
+            topological_order({"a": ("missing",)})
+
+
+class TestRunDag:
+    def test_runs_independent_steps_concurrently(self) -> None:
+        recorder = Recorder()
+        result = asyncio.run(run_dag(GRAPH, recorder))
+        assert result.succeeded == set(GRAPH)
+        assert recorder.max_running == 2
+        assert recorder.started.index("a") < recorder.started.index("b") < recorder.started.index("d")
+
+    def test_critical_path_bounds_duration(self) -> None:
+        wide = {f"s{index}": () for index in range(20)}
+        recorder = Recorder(delay=0.05)
+
+        async def timed() -> float:
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            await run_dag(wide, recorder)
+            return loop.time() - started
+
+        assert asyncio.run(timed()) < 0.5
+
+    def test_failure_blocks_only_its_descendants(self) -> None:
+        recorder = Recorder(fail={"b"})
+        result = asyncio.run(run_dag(GRAPH, recorder))
+        assert result.failed == {"b"}
+        assert result.blocked == {"d"}
+        assert result.succeeded == {"a", "c", "e"}
+
+    def test_resume_skips_finished_steps(self) -> None:
+        recorder = Recorder()
+        result = asyncio.run(run_dag(GRAPH, recorder, succeeded={"a", "c"}, failed={"e"}))
+        assert sorted(recorder.started) == ["b", "d"]
+        assert result.succeeded == {"a", "b", "c", "d"}
+        assert result.failed == {"e"}
+
+    def test_exception_cancels_running_steps(self) -> None:
+        cancelled: list[str] = []
+
+        async def run_step(key: str) -> bool:
+            if key == "a":
+                raise RuntimeError("boom")
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(key)
+                raise
+            return True
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(run_dag({"a": (), "e": ()}, run_step))
+        assert cancelled == ["e"]
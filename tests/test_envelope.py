@@ -0,0 +1,44 @@
+"""Tests for the binary job envelope shared by the API and the worker."""
+from __future__ import annotations
+
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "services" / "worker"))
+sys.path.insert(0, str(ROOT / "shared" / "py"))
+
+from danux_shared import envelope
+from worker.jobs import Job
+
+
+def test_round_trip() -> None:
+    run_id = str(uuid.uuid4())
+    created_at = datetime(2026, 3, 1, 12, 30, 5, 123456, tzinfo=timezone.utc)
+    raw = envelope.encode_job(run_id, created_at)
+    assert len(raw) == 25
+    assert raw[0] == envelope.ENVELOPE_VERSION
+    assert envelope.decode_job(raw) == (run_id, created_at)
+
+
+def test_keeps_the_instant_of_non_utc_timestamps() -> None:
+    created_at = datetime(2026, 3, 1, 14, 0, tzinfo=timezone(timedelta(hours=2)))
+    _, decoded = envelope.decode_job(envelope.encode_job(str(uuid.uuid4()), created_at))
+    assert decoded == created_at
+    assert decoded.tzinfo == timezone.utc
+
+
+@pytest.mark.parametrize("raw", [b"", b"\x01" * 24, b"\x02" + b"\x00" * 24, b'{"run_id": "x"}'])
+def test_rejects_malformed_envelopes(raw: bytes) -> None:
+    with pytest.raises(ValueError, match="invalid_job"):
+        envelope.decode_job(raw)
+
+
+@pytest.mark.parametrize("raw", [None, "job", b'{"run_id": "x", "created_at": "2026-03-01T00:00:00+00:00"}'])
+def test_worker_treats_non_envelope_jobs_as_malformed(raw: bytes | str | None) -> None:
+    with pytest.raises(ValueError, match="invalid_job"):
+        Job.from_raw(raw)
@@ -0,0 +1,66 @@
+"""Tests for the API's idempotency guard."""
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services" / "api"))
+
+from app.services.bloom import TimeWindowedBloomFilter
+from app.services.idempotency import IdempotencyGuard
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.keys: set[str] = set()
+
+    async def exists(self, *keys: str) -> int:
+        return sum(key in self.keys for key in keys)
+
+
+class FakePipeline:
+    def __init__(self) -> None:
+        self.commands: list[tuple[Any, ...]] = []
+
+    def set(self, *args: Any, **kwargs: Any) -> None:
+        self.commands.append(("set", *args))
+
+
+def make_guard(client: FakeRedis) -> IdempotencyGuard:
+    local = TimeWindowedBloomFilter(capacity=1000, error_rate=0.01, window_seconds=3600)
+    return IdempotencyGuard(client, local, ttl_seconds=60)  # type: ignore[arg-type]
+
+
+class TestIdempotencyGuard:
+    def test_key_reaches_local_filter_only_after_enqueue(self) -> None:
+        client = FakeRedis()
+        guard = make_guard(client)
+        pipe = FakePipeline()
+
+        guard.remember(pipe, "wf:evt-1")  # type: ignore[arg-type]
+        assert pipe.commands[0][:2] == ("set", "danux:idem:wf:evt-1")
+        assert "wf:evt-1" not in guard.local_filter
+
+        guard.remembered("wf:evt-1")
+        client.keys.add("danux:idem:wf:evt-1")
+        assert asyncio.run(guard.is_duplicate("wf:evt-1"))
+
+    def test_filter_hit_without_redis_record_is_a_false_positive(self) -> None:
+        client = FakeRedis()
+        guard = make_guard(client)
+        guard.remembered("wf:evt-1")
+        assert not asyncio.run(guard.is_duplicate("wf:evt-1"))
+        assert guard.stats.false_positives == 1
+
+    def test_failed_ingest_after_a_false_positive_does_not_block_the_retry(self) -> None:
+        client = FakeRedis()
+        guard = make_guard(client)
+        # The filter says "maybe" but Redis has no record of the key.
+        guard.local_filter.add("wf:evt-1")
+        assert not asyncio.run(guard.is_duplicate("wf:evt-1"))
+        # The run insert fails here, so remember() never runs.
+        assert client.keys == set()
+        assert not asyncio.run(guard.is_duplicate("wf:evt-1"))
+        assert guard.stats.false_positives == 2
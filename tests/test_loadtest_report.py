@@ -0,0 +1,55 @@
+"""Tests for the load-test report helpers."""
+from __future__ import annotations
+
+import math
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "loadtest"))
+
+from report import IngestSample, build_report, check_thresholds, latency_summary, percentile
+
+
+def test_percentile_is_nearest_rank() -> None:
+    ordered = [float(value) for value in range(1, 101)]
+    assert percentile(ordered, 50) == 50.0
+    assert percentile(ordered, 99) == 99.0
+    assert percentile(ordered, 100) == 100.0
+    assert percentile([3.0], 95) == 3.0
+    assert math.isnan(percentile([], 50))
+
+
+def test_latency_summary_in_milliseconds() -> None:
+    assert latency_summary([0.002, 0.001, 0.003]) == {"p50": 2.0, "p95": 3.0, "p99": 3.0, "max": 3.0, "mean": 2.0}
+    assert latency_summary([])["p99"] is None
+
+
+def test_build_report_counts_outcomes() -> None:
+    ingest = [
+        IngestSample(0, 0.010, 202),
+        IngestSample(1, 0.020, 202),
+        IngestSample(2, 0.005, 200),
+        IngestSample(3, 0.001, 429),
+        IngestSample(4, 10.0, None, "TimeoutError"),
+    ]
+    # seq 2 was a duplicate, so a receipt for it does not count as completed.
+    report = build_report({"rps": 5}, ingest, {0: 0.5, 2: 0.4}, send_seconds=1.0, total_seconds=2.0)
+
+    assert report["ingest"]["sent"] == 5
+    assert report["ingest"]["accepted"] == 2
+    assert report["ingest"]["duplicates"] == 1
+    assert report["ingest"]["rejected"] == 1
+    assert report["ingest"]["status_counts"] == {"200": 1, "202": 2, "429": 1}
+    assert report["ingest"]["error_counts"] == {"TimeoutError": 1}
+    assert report["ingest"]["error_rate"] == 0.4
+    assert report["ingest"]["latency_ms"]["max"] == 20.0
+    assert report["ingest"]["throughput_rps"] == 2.0
+    assert report["end_to_end"]["completed"] == 1
+    assert report["end_to_end"]["missing"] == 1
+    assert report["end_to_end"]["latency_ms"]["p50"] == 500.0
+
+    failures = check_thresholds(report, max_error_rate=0.1, max_p99_ms=100)
+    assert len(failures) == 3
+    assert check_thresholds(report, max_error_rate=0, max_p99_ms=0) == [
+        "1 accepted events never reached the target"
+    ]
@@ -0,0 +1,186 @@
+"""Tests for the worker's batching log writer."""
+from __future__ import annotations
+
+import asyncio
+import sys
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services" / "worker"))
+
+from worker.logwriter import _STATEMENTS, LogWriter
+
+_KINDS = {statement: kind for kind, statement in _STATEMENTS.items()}
+
+
+class FakeEngine:
+    """Records each committed transaction as a list of (kind, columns)."""
+
+    def __init__(self) -> None:
+        self.commits: list[list[tuple[str, dict[str, list[Any]]]]] = []
+        # Raised by the next transactions, one per attempt.
+        self.failures: list[Exception] = []
+
+    def begin(self) -> "FakeTransaction":
+        return FakeTransaction(self)
+
+
+class FakeTransaction:
+    def __init__(self, engine: FakeEngine) -> None:
+        self.engine = engine
+        self.statements: list[tuple[str, dict[str, list[Any]]]] = []
+
+    async def __aenter__(self) -> "FakeTransaction":
+        return self
+
+    async def __aexit__(self, exc_type: object, *exc: object) -> None:
+        if exc_type is None:
+            self.engine.commits.append(self.statements)
+
+    async def execute(self, statement: Any, params: dict[str, list[Any]]) -> None:
+        if self.engine.failures:
+            raise self.engine.failures.pop(0)
+        self.statements.append((_KINDS[statement], params))
+
+
+def run_with_writer(
+    test: Callable[[LogWriter, FakeEngine], Awaitable[None]],
+    *,
+    max_buffer: int = 100,
+    batch_size: int = 10,
+    flush_interval_seconds: float = 10.0,
+    start: bool = True,
+) -> FakeEngine:
+    engine = FakeEngine()
+
+    async def main() -> None:
+        writer = LogWriter(
+            engine,  # type: ignore[arg-type]
+            max_buffer=max_buffer,
+            batch_size=batch_size,
+            flush_interval_seconds=flush_interval_seconds,
+        )
+        if start:
+            writer.start()
+        await asyncio.wait_for(test(writer, engine), timeout=5)
+        await asyncio.wait_for(writer.aclose(), timeout=5)
+
+    asyncio.run(main())
+    return engine
+
+
+def _operational_error() -> OperationalError:
+    return OperationalError("UPDATE runs", {}, Exception("connection lost"))
+
+
+class TestLogWriter:
+    def test_full_batch_flushes_without_waiting_for_the_interval(self) -> None:
+        async def test(writer: LogWriter, engine: FakeEngine) -> None:
+            await writer.log("r1", "info", "a")
+            await writer.log("r1", "info", "b")
+            await writer.status("r1", "2024-01-01T00:00:00+00:00", "running")
+            (commit,) = engine.commits
+            assert commit[0] == ("log", {"run_id": ["r1", "r1"], "level": ["info", "info"], "message": ["a", "b"]})
+            assert commit[1][0] == "status"
+            assert commit[1][1]["status"] == ["running"]
+
+        run_with_writer(test, batch_size=3)
+
+    def test_partial_batch_flushes_after_the_interval(self) -> None:
+        async def test(writer: LogWriter, engine: FakeEngine) -> None:
+            await writer.status("r1", "2024-01-01T00:00:00+00:00", "running")
+            assert len(engine.commits) == 1
+
+        run_with_writer(test, batch_size=100, flush_interval_seconds=0.01)
+
+    def test_statements_run_in_dependency_order(self) -> None:
+        async def test(writer: LogWriter, engine: FakeEngine) -> None:
+            await asyncio.gather(
+                writer.status("r1", "2024-01-01T00:00:00+00:00", "succeeded", finished=True),
+                writer.step("r1", "2024-01-01T00:00:00+00:00", "a", "succeeded"),
+                writer.attempt("r1", 1, 200, 12, None),
+                writer.log("r1", "info", "done"),
+            )
+            assert [kind for kind, _ in engine.commits[0]] == ["attempt", "log", "step", "status"]
+
+        run_with_writer(test, batch_size=4)
+
+    def test_last_change_of_a_step_in_a_batch_wins(self) -> None:
+        async def test(writer: LogWriter, engine: FakeEngine) -> None:
+            await asyncio.gather(
+                writer.step("r1", "2024-01-01T00:00:00+00:00", "a", "retrying", status_code=503),
+                writer.step("r1", "2024-01-01T00:00:00+00:00", "b", "succeeded"),
+                writer.step("r1", "2024-01-01T00:00:00+00:00", "a", "succeeded", status_code=200),
+            )
+            (kind, columns), = engine.commits[0]
+            assert kind == "step"
+            assert columns["step_key"] == ["b", "a"]
+            assert columns["status"] == ["succeeded", "succeeded"]
+            assert columns["status_code"] == [None, 200]
+
+        run_with_writer(test, batch_size=3)
+
+    def test_flush_soon_skips_the_interval(self) -> None:
+        async def test(writer: LogWriter, engine: FakeEngine) -> None:
+            pending = asyncio.create_task(writer.status("r1", "2024-01-01T00:00:00+00:00", "running"))
+            await asyncio.sleep(0.01)
+            assert engine.commits == []
+            writer.flush_soon()
+            await pending
+            assert len(engine.commits) == 1
+
+        run_with_writer(test, batch_size=100, flush_interval_seconds=60)
+
+    def test_aclose_drains_the_buffer(self) -> None:
+        async def test(writer: LogWriter, engine: FakeEngine) -> None:
+            for index in range(25):
+                await writer.log("r1", "info", str(index))
+
+        engine = run_with_writer(test, batch_size=10, flush_interval_seconds=60)
+        messages = [m for commit in engine.commits for _, columns in commit for m in columns["message"]]
+        assert messages == [str(index) for index in range(25)]
+
+    def test_full_buffer_makes_writers_wait(self) -> None:
+        async def test(writer: LogWriter, engine: FakeEngine) -> None:
+            await writer.log("r1", "info", "a")
+            await writer.log("r1", "info", "b")
+            blocked = asyncio.create_task(writer.log("r1", "info", "c"))
+            await asyncio.sleep(0.01)
+            assert not blocked.done()
+            writer.start()
+            await blocked
+
+        engine = run_with_writer(test, max_buffer=2, flush_interval_seconds=0.01, start=False)
+        assert sum(len(columns["message"]) for commit in engine.commits for _, columns in commit) == 3
+
+    def test_transient_database_errors_are_retried(self) -> None:
+        async def test(writer: LogWriter, engine: FakeEngine) -> None:
+            engine.failures = [_operational_error()]
+            await writer.status("r1", "2024-01-01T00:00:00+00:00", "running")
+            assert len(engine.commits) == 1
+
+        run_with_writer(test, batch_size=1)
+
+    def test_unflushable_batch_fails_its_waiters(self) -> None:
+        async def test(writer: LogWriter, engine: FakeEngine) -> None:
+            engine.failures = [_operational_error() for _ in range(3)]
+            with pytest.raises(OperationalError):
+                await writer.status("r1", "2024-01-01T00:00:00+00:00", "running")
+            await writer.status("r2", "2024-01-01T00:00:00+00:00", "running")
+            assert len(engine.commits) == 1
+
+        run_with_writer(test, batch_size=1)
+
+    def test_unexpected_errors_do_not_stop_the_writer(self) -> None:
+        async def test(writer: LogWriter, engine: FakeEngine) -> None:
+            engine.failures = [TypeError("cannot adapt type")]
+            with pytest.raises(TypeError):
+                await writer.step("r1", "2024-01-01T00:00:00+00:00", "a", "succeeded")
+            await writer.status("r1", "2024-01-01T00:00:00+00:00", "succeeded", finished=True)
+            assert len(engine.commits) == 1
+
+        run_with_writer(test, batch_size=1)
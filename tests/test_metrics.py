@@ -0,0 +1,65 @@
+"""Tests for the metrics registry shared by the API and the worker."""
+from __future__ import annotations
+
+import math
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "shared" / "py"))
+
+from danux_shared import metrics
+
+
+def test_counter_and_gauge_render() -> None:
+    registry = metrics.Registry()
+    counter = registry.counter("jobs_total", "Jobs.", ("outcome",))
+    gauge = registry.gauge("depth", "Depth.")
+    counter.inc("ok")
+    counter.inc("ok", amount=2)
+    counter.inc('b"ad\n')
+    gauge.set(1.5)
+
+    assert registry.render().splitlines() == [
+        "# HELP jobs_total Jobs.",
+        "# TYPE jobs_total counter",
+        'jobs_total{outcome="ok"} 3',
+        'jobs_total{outcome="b\\"ad\\n"} 1',
+        "# HELP depth Depth.",
+        "# TYPE depth gauge",
+        "depth 1.5",
+    ]
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    registry = metrics.Registry()
+    histogram = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value, "/x")
+
+    assert registry.render().splitlines()[2:] == [
+        'latency_seconds_bucket{route="/x",le="0.1"} 2',
+        'latency_seconds_bucket{route="/x",le="1"} 3',
+        'latency_seconds_bucket{route="/x",le="+Inf"} 4',
+        'latency_seconds_sum{route="/x"} 2.65',
+        'latency_seconds_count{route="/x"} 4',
+    ]
+
+
+def test_histogram_quantile_interpolates_within_bucket() -> None:
+    histogram = metrics.Histogram("latency_seconds", "Latency.", buckets=(1.0, 2.0, 4.0))
+    assert math.isnan(histogram.quantile(0.5))
+    for value in (0.5, 1.5, 1.5, 3.0):
+        histogram.observe(value)
+    assert histogram.quantile(0.5) == pytest.approx(1.5)
+    assert histogram.quantile(1.0) == pytest.approx(4.0)
+    histogram.observe(100.0)
+    assert histogram.quantile(0.99) == 4.0
+
+
+def test_collect_callbacks_run_before_render() -> None:
+    registry = metrics.Registry()
+    gauge = registry.gauge("pool_in_use", "In use.")
+    registry.on_collect(lambda: gauge.set(7))
+    assert "pool_in_use 7" in registry.render()
@@ -0,0 +1,34 @@
+"""Tests for runs history cursors."""
+from __future__ import annotations
+
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services" / "api"))
+
+from app.services.pagination import Cursor, decode_cursor, encode_cursor
+
+
+class TestCursor:
+    def test_roundtrip(self) -> None:
+        cursor = Cursor(created_at=datetime(2026, 10, 19, 12, 30, 0, 123456, tzinfo=timezone.utc), id=uuid4())
+        assert decode_cursor(encode_cursor(cursor)) == cursor
+
+    def test_token_is_url_safe(self) -> None:
+        token = encode_cursor(Cursor(created_at=datetime.now(timezone.utc), id=uuid4()))
+        assert "=" not in token
+        assert "+" not in token
+        assert "/" not in token
+
+    def test_garbage_raises(self) -> None:
+        with pytest.raises(ValueError, match="invalid_cursor"):
+            decode_cursor("not-a-cursor")
+
+    def test_naive_timestamp_raises(self) -> None:
+        token = encode_cursor(Cursor(created_at=datetime(2026, 1, 1), id=uuid4()))
+        with pytest.raises(ValueError, match="invalid_cursor"):
+            decode_cursor(token)
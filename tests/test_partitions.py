@@ -0,0 +1,55 @@
+"""Tests for the API's partition maintenance loop."""
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy.exc import OperationalError
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services" / "api"))
+
+from app.services.partitions import ensure_partitions
+
+
+class FakeEngine:
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.calls: list[dict[str, Any]] = []
+
+    def begin(self) -> "FakeEngine":
+        return self
+
+    async def __aenter__(self) -> "FakeEngine":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        return None
+
+    async def execute(self, statement: Any, params: dict[str, Any]) -> None:
+        self.calls.append(params)
+        if len(self.calls) <= self.failures:
+            raise OperationalError("SELECT danux_ensure_partitions", {}, Exception("connection lost"))
+
+
+def run_for(engine: FakeEngine, seconds: float) -> None:
+    async def main() -> None:
+        task = asyncio.create_task(ensure_partitions(engine, 7, interval_seconds=0.01))  # type: ignore[arg-type]
+        await asyncio.sleep(seconds)
+        task.cancel()
+
+    asyncio.run(main())
+
+
+def test_creates_partitions_at_startup_and_periodically() -> None:
+    engine = FakeEngine()
+    run_for(engine, 0.05)
+    assert engine.calls[0] == {"days_ahead": 7}
+    assert len(engine.calls) > 1
+
+
+def test_keeps_going_after_database_errors() -> None:
+    engine = FakeEngine(failures=1)
+    run_for(engine, 0.05)
+    assert len(engine.calls) > 1
@@ -0,0 +1,144 @@
+"""Tests for how ingested payloads are read, stored and recovered for delivery."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import sys
+import threading
+from pathlib import Path
+from typing import Any
+
+import pytest
+import zstandard
+from fastapi import HTTPException
+from starlette.requests import Request
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "services" / "api"))
+sys.path.insert(0, str(ROOT / "services" / "worker"))
+sys.path.insert(0, str(ROOT / "shared" / "py"))
+
+from app.services.payloads import build_delivery, build_payloads, build_snapshot, read_body
+from danux_shared.cipher import PayloadCipher
+from danux_shared.redaction import REDACTED, Redactor
+from worker.payloads import open_delivery
+
+
+def make_request(chunks: list[bytes], content_length: int | None = None) -> Request:
+    headers = [] if content_length is None else [(b"content-length", str(content_length).encode())]
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": index < len(chunks) - 1}
+        for index, chunk in enumerate(chunks)
+    ]
+
+    async def receive() -> dict[str, object]:
+        return messages.pop(0)
+
+    return Request({"type": "http", "method": "POST", "headers": headers}, receive)
+
+
+class TestReadBody:
+    def test_reads_streamed_chunks(self) -> None:
+        assert asyncio.run(read_body(make_request([b'{"a":', b"1}"]), max_bytes=100)) == b'{"a":1}'
+
+    def test_rejects_declared_length_before_reading(self) -> None:
+        request = make_request([b"x" * 10], content_length=101)
+        with pytest.raises(HTTPException) as raised:
+            asyncio.run(read_body(request, max_bytes=100))
+        assert raised.value.status_code == 413
+
+    def test_rejects_malformed_content_length(self) -> None:
+        request = make_request([b"{}"])
+        request.scope["headers"] = [(b"content-length", b"ten")]
+        with pytest.raises(HTTPException) as raised:
+            asyncio.run(read_body(request, max_bytes=100))
+        assert raised.value.status_code == 400
+
+    def test_rejects_stream_that_outgrows_the_limit(self) -> None:
+        # No Content-Length, e.g. chunked transfer encoding.
+        with pytest.raises(HTTPException) as raised:
+            asyncio.run(read_body(make_request([b"x" * 60, b"x" * 60]), max_bytes=100))
+        assert raised.value.status_code == 413
+
+
+class TestBuildSnapshot:
+    def test_small_snapshots_are_stored_uncompressed(self) -> None:
+        snapshot = build_snapshot({"a": 1}, Redactor(), compress_min_bytes=1024)
+        assert snapshot.codec == "identity"
+        assert snapshot.data == b'{"a":1}'
+        assert snapshot.size == len(snapshot.data)
+
+    def test_large_snapshots_are_compressed_and_addressed_by_raw_bytes(self) -> None:
+        payload = {"items": ["x" * 100] * 50}
+        snapshot = build_snapshot(payload, Redactor(), compress_min_bytes=1024)
+        raw = zstandard.ZstdDecompressor().decompress(snapshot.data)
+        assert snapshot.codec == "zstd"
+        assert snapshot.size == len(raw)
+        assert snapshot.digest == hashlib.sha256(raw).digest()
+        assert build_snapshot(payload, Redactor(), compress_min_bytes=10**9).digest == snapshot.digest
+
+    def test_snapshots_are_redacted(self) -> None:
+        snapshot = build_snapshot({"token": "t", "n": 1}, Redactor(), compress_min_bytes=1024)
+        assert json.loads(snapshot.data) == {"token": REDACTED, "n": 1}
+
+
+class ThreadRecordingRedactor(Redactor):
+    def __init__(self) -> None:
+        super().__init__()
+        self.threads: list[int] = []
+
+    def redact(self, value: Any) -> Any:
+        self.threads.append(threading.get_ident())
+        return super().redact(value)
+
+
+class TestBuildPayloads:
+    def run(self, body: bytes, offload_min_bytes: int) -> tuple[int, ThreadRecordingRedactor]:
+        redactor = ThreadRecordingRedactor()
+
+        async def main() -> int:
+            snapshot, delivery = await build_payloads(
+                json.loads(body),
+                body,
+                redactor,
+                PayloadCipher("k" * 32),
+                compress_min_bytes=1024,
+                offload_min_bytes=offload_min_bytes,
+            )
+            raw = snapshot.data
+            if snapshot.codec == "zstd":
+                raw = zstandard.ZstdDecompressor().decompress(raw)
+            assert json.loads(raw) == json.loads(body)
+            assert open_delivery(delivery.codec, delivery.data, PayloadCipher("k" * 32)) == body
+            return threading.get_ident()
+
+        return asyncio.run(main()), redactor
+
+    def test_small_bodies_are_built_on_the_event_loop(self) -> None:
+        loop_thread, redactor = self.run(b'{"n": 1}', offload_min_bytes=1024)
+        assert redactor.threads[0] == loop_thread
+
+    def test_large_bodies_are_built_in_the_thread_pool(self) -> None:
+        body = json.dumps({"items": ["x" * 100] * 50}).encode()
+        loop_thread, redactor = self.run(body, offload_min_bytes=1024)
+        assert redactor.threads[0] != loop_thread
+
+
+class TestDeliveryPayload:
+    @pytest.mark.parametrize("compress_min_bytes", [1, 10**6])
+    def test_worker_recovers_the_body_byte_for_byte(self, compress_min_bytes: int) -> None:
+        body = b'{"token": "t", "auth": "Bearer abcdefghijklmnop", "n": 1}'
+        delivery = build_delivery(body, PayloadCipher("k" * 32), compress_min_bytes)
+        assert delivery.codec == ("zstd" if compress_min_bytes == 1 else "identity")
+        assert b"abcdefghijklmnop" not in delivery.data
+        assert open_delivery(delivery.codec, delivery.data, PayloadCipher("k" * 32)) == body
+
+    def test_wrong_key_or_tampering_is_rejected(self) -> None:
+        delivery = build_delivery(b'{"n": 1}', PayloadCipher("k" * 32), 10**6)
+        with pytest.raises(ValueError):
+            open_delivery(delivery.codec, delivery.data, PayloadCipher("other"))
+        tampered = delivery.data[:-1] + bytes([delivery.data[-1] ^ 1])
+        with pytest.raises(ValueError):
+            open_delivery(delivery.codec, tampered, PayloadCipher("k" * 32))
+
@@ -0,0 +1,62 @@
+"""Tests for the API's cached readiness probes."""
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services" / "api"))
+
+from app.services.readiness import Readiness
+from tests.fakes import FakeClock
+
+
+async def healthy() -> dict[str, float]:
+    return {"pool_idle": 3}
+
+
+async def failing() -> None:
+    raise ConnectionRefusedError("postgresql://danux:secret@db/danux")
+
+
+async def hanging() -> None:
+    await asyncio.sleep(10)
+
+
+def make_readiness(clock: FakeClock, **probes: object) -> Readiness:
+    return Readiness(probes, timeout_seconds=0.05, stale_after_seconds=10.0, clock=clock)  # type: ignore[arg-type]
+
+
+class TestReadiness:
+    def test_not_ready_until_warmed_up_and_probed(self, clock: FakeClock) -> None:
+        readiness = make_readiness(clock, database=healthy)
+        assert not readiness.ready
+        asyncio.run(readiness.probe_once())
+        assert not readiness.ready
+        readiness.warmed_up = True
+        assert readiness.ready
+        assert readiness.as_dict()["checks"]["database"]["pool_idle"] == 3  # type: ignore[index]
+
+    def test_failing_probe_reports_only_the_error_type(self, clock: FakeClock) -> None:
+        readiness = make_readiness(clock, database=healthy, redis=failing)
+        readiness.warmed_up = True
+        asyncio.run(readiness.probe_once())
+        assert not readiness.ready
+        report = readiness.as_dict()
+        assert report["status"] == "not_ready"
+        assert report["checks"]["redis"]["error"] == "ConnectionRefusedError"  # type: ignore[index]
+
+    def test_probe_timeout(self, clock: FakeClock) -> None:
+        readiness = make_readiness(clock, redis=hanging)
+        readiness.warmed_up = True
+        asyncio.run(readiness.probe_once())
+        assert readiness.results["redis"].error == "timeout"
+
+    def test_stale_results_stop_counting(self, clock: FakeClock) -> None:
+        readiness = make_readiness(clock, database=healthy)
+        readiness.warmed_up = True
+        asyncio.run(readiness.probe_once())
+        clock.now = 10.0
+        assert readiness.ready
+        clock.now = 10.5
+        assert not readiness.ready
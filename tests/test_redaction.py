@@ -0,0 +1,166 @@
+"""Tests for the payload and log redaction engine shared by the API and the worker."""
+from __future__ import annotations
+
+import io
+import logging
+import sys
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "shared" / "py"))
+
+from danux_shared.redaction import REDACTED, RedactingFilter, Redactor, install_log_redaction
+
+
+class TestRedactor:
+    def test_redacts_sensitive_keys(self) -> None:
+        redactor = Redactor()
+        payload = {
+            "Authorization": "Basic abc",
+            "access_token": "t",
+            "x-api-key": "k",
+            "apiKey": "k",
+            "clientSecret": "s",
+            "user": {"password": "p", "name": "ada"},
+        }
+        assert redactor.redact(payload) == {
+            "Authorization": REDACTED,
+            "access_token": REDACTED,
+            "x-api-key": REDACTED,
+            "apiKey": REDACTED,
+            "clientSecret": REDACTED,
+            "user": {"password": REDACTED, "name": "ada"},
+        }
+
+    def test_keeps_keys_that_only_contain_a_word(self) -> None:
+        redactor = Redactor()
+        payload = {"tokens_used": 12, "sessionless": True, "author": "ada"}
+        assert redactor.redact(payload) == payload
+
+    def test_redacts_credentials_inside_values(self) -> None:
+        redactor = Redactor()
+        payload = {
+            "header": "Bearer abcdefghijklmnop",
+            "jwt": "eyJhbGciOi.eyJzdWIiOi.c2lnbmF0dXJl",
+            "callback": "https://example.com/cb?api_key=123&page=2",
+            "dsn": "postgresql://danux:hunter2@db:5432/danux",
+        }
+        assert redactor.redact(payload) == {
+            "header": REDACTED,
+            "jwt": REDACTED,
+            "callback": f"https://example.com/cb?{REDACTED}&page=2",
+            "dsn": f"postgresql://{REDACTED}@db:5432/danux",
+        }
+
+    def test_literal_prefilter_keeps_every_pattern_reachable(self) -> None:
+        redactor = Redactor()
+        assert redactor.redact_text("BEARER abcdefghijklmnop") == REDACTED
+        assert redactor.redact_text("x Token abcdefghijklmnop") == f"x {REDACTED}"
+        assert redactor.redact_text("eyJa.eyJb.c") == REDACTED
+        plain = "Stainless steel bottle, 750 ml"
+        assert redactor.redact_text(plain) is plain
+        # Custom patterns may match anything, so they bypass the prefilter.
+        assert Redactor(value_patterns=[r"\bsteel\b"]).redact_text(plain) == f"Stainless {REDACTED} bottle, 750 ml"
+
+    def test_untouched_subtrees_are_not_copied(self) -> None:
+        redactor = Redactor()
+        clean = {"items": [{"sku": "a", "qty": 1}], "customer": {"name": "ada"}}
+        assert redactor.redact(clean) is clean
+
+        payload = {"items": clean["items"], "customer": {"name": "ada", "token": "t"}}
+        redacted = redactor.redact(payload)
+        assert redacted is not payload
+        assert redacted["items"] is clean["items"]
+        assert payload["customer"]["token"] == "t"
+
+    def test_extra_key_words_and_patterns(self) -> None:
+        redactor = Redactor(key_words=["iban"], value_patterns=[r"\bacct_[0-9]+\b"])
+        assert redactor.redact({"iban": "BE00", "note": "acct_123 paid"}) == {
+            "iban": REDACTED,
+            "note": f"{REDACTED} paid",
+        }
+
+
+class TestRedactingFilter:
+    def test_redacts_formatted_message(self) -> None:
+        record = logging.LogRecord(
+            "danux", logging.INFO, __file__, 1, "calling %s", ("https://u:pw@example.com",), None
+        )
+        assert RedactingFilter(Redactor()).filter(record)
+        assert record.getMessage() == f"calling https://{REDACTED}@example.com"
+
+    def test_redacts_tracebacks(self) -> None:
+        stream = io.StringIO()
+        handler = logging.StreamHandler(stream)
+        handler.addFilter(RedactingFilter(Redactor()))
+        logger = logging.getLogger("danux.test_redacts_tracebacks")
+        logger.addHandler(handler)
+        logger.propagate = False
+        try:
+            try:
+                raise ConnectionError("Bearer abcdefghijklmnop1234 to postgres://u:hunter2@db")
+            except ConnectionError:
+                logger.exception("job failed")
+        finally:
+            logger.removeHandler(handler)
+        output = stream.getvalue()
+        assert "Traceback" in output
+        assert f"ConnectionError: {REDACTED} to postgres://{REDACTED}@db" in output
+        assert "abcdefghijklmnop1234" not in output
+        assert "hunter2" not in output
+
+
+@contextmanager
+def bare_root_logger() -> Iterator[logging.Logger]:
+    """The root logger stripped of handlers (pytest's included), restored afterwards."""
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    root.handlers.clear()
+    try:
+        yield root
+    finally:
+        root.handlers[:] = handlers
+        root.setLevel(level)
+
+
+class TestInstallLogRedaction:
+    def test_adds_a_redacting_root_handler_when_there_is_none(self) -> None:
+        stream = io.StringIO()
+        with bare_root_logger() as root:
+            install_log_redaction(Redactor(), "INFO")
+            (handler,) = root.handlers
+            assert isinstance(handler, logging.StreamHandler)
+            handler.setStream(stream)
+            logging.getLogger("app.routes.webhooks").info("calling %s", "https://u:pw@example.com")
+        assert f"calling https://{REDACTED}@example.com" in stream.getvalue()
+        assert "pw" not in stream.getvalue()
+
+    def test_filters_existing_handlers_once(self) -> None:
+        stream, access_stream = io.StringIO(), io.StringIO()
+        access = logging.getLogger("uvicorn.access")
+        access_handler = logging.StreamHandler(access_stream)
+        # As in uvicorn's default config.
+        access.addHandler(access_handler)
+        access.propagate = False
+        try:
+            with bare_root_logger() as root:
+                root.addHandler(logging.StreamHandler(stream))
+                install_log_redaction(Redactor(), "INFO", logger_names=("uvicorn.access",))
+                install_log_redaction(Redactor(), "INFO", logger_names=("uvicorn.access",))
+
+                assert len(root.handlers) == 1
+                assert len(access_handler.filters) == 1
+                logging.getLogger("worker.jobs").info("token=abc123")
+                access.warning("GET /?api_key=abc123")
+        finally:
+            access.removeHandler(access_handler)
+            access.propagate = True
+        assert stream.getvalue() == f"{REDACTED}\n"
+        assert access_stream.getvalue() == f"GET /?{REDACTED}\n"
+
+    def test_sets_the_level(self) -> None:
+        with bare_root_logger() as root:
+            install_log_redaction(Redactor(), "WARNING")
+            assert root.level == logging.WARNING
+
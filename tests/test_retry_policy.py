@@ -0,0 +1,37 @@
+"""Tests for the worker's retry policy."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services" / "worker"))
+
+from worker.retry import backoff_delay, is_retryable
+
+
+class TestBackoffDelay:
+    def test_ceiling_doubles_per_attempt(self) -> None:
+        ceilings = [backoff_delay(attempt, 2.0, 900.0, rng=lambda: 1.0) for attempt in (1, 2, 3, 4)]
+        assert ceilings == [2.0, 4.0, 8.0, 16.0]
+
+    def test_ceiling_is_capped(self) -> None:
+        assert backoff_delay(30, 2.0, 900.0, rng=lambda: 1.0) == 900.0
+
+    def test_full_jitter_can_be_zero(self) -> None:
+        assert backoff_delay(5, 2.0, 900.0, rng=lambda: 0.0) == 0.0
+
+    def test_delay_within_bounds(self) -> None:
+        for _ in range(100):
+            assert 0.0 <= backoff_delay(3, 2.0, 900.0) <= 8.0
+
+
+class TestIsRetryable:
+    @pytest.mark.parametrize("status_code", [None, 408, 425, 429, 500, 502, 503, 504])
+    def test_transient_failures(self, status_code: int | None) -> None:
+        assert is_retryable(status_code)
+
+    @pytest.mark.parametrize("status_code", [400, 401, 403, 404, 410, 422])
+    def test_permanent_failures(self, status_code: int) -> None:
+        assert not is_retryable(status_code)
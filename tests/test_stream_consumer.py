@@ -0,0 +1,250 @@
+"""Tests for the worker's stream consumer recovery paths."""
+from __future__ import annotations
+
+import asyncio
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "services" / "worker"))
+sys.path.insert(0, str(ROOT / "shared" / "py"))
+
+from danux_shared.envelope import encode_job
+from worker.jobs import dead_letter_runs
+from worker.maintenance import stranded_before
+from worker.queue import Delivery, StreamConsumer
+
+
+class FakePipeline:
+    def __init__(self, client: "FakeRedis") -> None:
+        self.client = client
+        self.calls: list[tuple[str, tuple[Any, ...], dict[str, Any]]] = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        return None
+
+    def __getattr__(self, name: str) -> Any:
+        def record(*args: Any, **kwargs: Any) -> None:
+            self.calls.append((name, args, kwargs))
+
+        return record
+
+    async def execute(self) -> list[Any]:
+        return [await getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+class FakeRedis:
+    """Just enough of a stream consumer group for StreamConsumer."""
+
+    def __init__(self) -> None:
+        self.claimable: list[tuple[bytes, dict[bytes, bytes] | None]] = []
+        # message id -> (owning consumer, times delivered)
+        self.pending: dict[str, tuple[str, int]] = {}
+        self.consumers: list[dict[str, Any]] = []
+        self.dead: list[dict[Any, Any]] = []
+        self.acked: list[str] = []
+        self.deleted_consumers: list[str] = []
+        self.groups: list[dict[str, Any]] = []
+        self.entries: list[bytes] = []
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    async def xautoclaim(self, stream: str, group: str, consumer: str, **kwargs: Any) -> list[Any]:
+        for message_id, fields in self.claimable:
+            if fields is not None:
+                owner, times = self.pending[message_id.decode()]
+                self.pending[message_id.decode()] = (consumer, times + 1)
+        return [b"0-0", self.claimable, []]
+
+    async def xpending_range(
+        self, stream: str, group: str, min: str, max: str, count: int, consumername: str | None = None
+    ) -> list[dict[str, Any]]:
+        def key(message_id: str) -> tuple[int, int]:
+            ms, seq = message_id.split("-")
+            return int(ms), int(seq)
+
+        items = [
+            {"message_id": message_id.encode(), "consumer": owner.encode(), "times_delivered": times}
+            for message_id, (owner, times) in sorted(self.pending.items(), key=lambda item: key(item[0]))
+            if key(min) <= key(message_id) <= key(max) and (consumername is None or owner == consumername)
+        ]
+        return items[:count]
+
+    async def xadd(self, stream: str, fields: dict[Any, Any]) -> bytes:
+        self.dead.append(fields)
+        return b"1-0"
+
+    async def xack(self, stream: str, group: str, *message_ids: str) -> int:
+        self.acked.extend(message_ids)
+        return len(message_ids)
+
+    async def xinfo_groups(self, stream: str) -> list[dict[str, Any]]:
+        return self.groups
+
+    async def xrange(self, stream: str, min: str = "-", count: int | None = None) -> list[Any]:
+        after = int(min.lstrip("(").split("-")[0])
+        return [(entry, {}) for entry in self.entries if int(entry.split(b"-")[0]) > after][:count]
+
+    async def xinfo_consumers(self, stream: str, group: str) -> list[dict[str, Any]]:
+        return self.consumers
+
+    async def xgroup_delconsumer(self, stream: str, group: str, name: str) -> int:
+        self.deleted_consumers.append(name)
+        return 0
+
+
+class FakeEngine:
+    """Records the parameters of every executed statement."""
+
+    def __init__(self) -> None:
+        self.executed: list[dict[str, Any]] = []
+
+    def begin(self) -> "FakeEngine":
+        return self
+
+    async def __aenter__(self) -> "FakeEngine":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        return None
+
+    async def execute(self, statement: Any, params: dict[str, Any]) -> None:
+        self.executed.append(params)
+
+
+def make_consumer(client: FakeRedis, **kwargs: Any) -> StreamConsumer:
+    return StreamConsumer(
+        client, "runs", "workers", "me", claim_idle_ms=1000, max_deliveries=3, **kwargs  # type: ignore[arg-type]
+    )
+
+
+class TestClaimStalled:
+    def test_dead_letters_entries_past_max_deliveries(self) -> None:
+        client = FakeRedis()
+        client.pending = {"1-0": ("gone", 1), "2-0": ("gone", 3)}
+        client.claimable = [(b"1-0", {b"job": b"a"}), (b"2-0", {b"job": b"b"})]
+        consumer = make_consumer(client)
+
+        claimed = asyncio.run(consumer.claim_stalled(10))
+
+        assert [d.message_id for d in claimed] == ["1-0"]
+        assert client.dead == [{b"job": b"b", b"message_id": "2-0"}]
+        assert client.acked == ["2-0"]
+        assert consumer.dead_lettered == 1
+
+    def test_own_in_flight_entries_do_not_hide_claimed_ones(self) -> None:
+        client = FakeRedis()
+        # 2-0 and 3-0 sit between the claimed ids and already belong to us.
+        client.pending = {"1-0": ("gone", 1), "2-0": ("me", 1), "3-0": ("me", 1), "4-0": ("gone", 5)}
+        client.claimable = [(b"1-0", {b"job": b"a"}), (b"4-0", {b"job": b"d"})]
+        consumer = make_consumer(client)
+
+        claimed = asyncio.run(consumer.claim_stalled(10))
+
+        assert [d.message_id for d in claimed] == ["1-0"]
+        assert client.acked == ["4-0"]
+
+    def test_skips_entries_deleted_from_the_stream(self) -> None:
+        client = FakeRedis()
+        client.pending = {"1-0": ("gone", 1)}
+        client.claimable = [(b"1-0", {b"job": b"a"}), (b"9-0", None)]
+
+        claimed = asyncio.run(make_consumer(client).claim_stalled(10))
+
+        assert [d.message_id for d in claimed] == ["1-0"]
+        assert client.dead == []
+
+
+    def test_records_dead_lettered_runs_before_acking(self) -> None:
+        client = FakeRedis()
+        client.pending = {"2-0": ("gone", 3)}
+        client.claimable = [(b"2-0", {b"job": b"b"})]
+        seen: list[tuple[list[str], list[str]]] = []
+
+        async def on_dead_letter(deliveries: list[Delivery]) -> None:
+            seen.append(([d.message_id for d in deliveries], list(client.acked)))
+
+        asyncio.run(make_consumer(client, on_dead_letter=on_dead_letter).claim_stalled(10))
+
+        assert seen == [(["2-0"], [])]
+        assert client.acked == ["2-0"]
+
+    def test_entries_stay_pending_when_recording_fails(self) -> None:
+        client = FakeRedis()
+        client.pending = {"2-0": ("gone", 3)}
+        client.claimable = [(b"2-0", {b"job": b"b"})]
+
+        async def on_dead_letter(deliveries: list[Delivery]) -> None:
+            raise ConnectionError("database unavailable")
+
+        consumer = make_consumer(client, on_dead_letter=on_dead_letter)
+        with pytest.raises(ConnectionError):
+            asyncio.run(consumer.claim_stalled(10))
+        assert client.dead == []
+        assert client.acked == []
+        assert consumer.dead_lettered == 0
+
+
+class TestDeadLetterRuns:
+    def test_marks_the_runs_of_decodable_entries(self) -> None:
+        engine = FakeEngine()
+        created_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        run_id = "0b6f6c1e-5d0a-4c8e-9a43-2f1d1b7c9e10"
+        deliveries = [
+            Delivery("1-0", {b"job": encode_job(run_id, created_at)}),
+            Delivery("2-0", {b"job": b"garbage"}),
+        ]
+
+        asyncio.run(dead_letter_runs(engine, deliveries, 5))  # type: ignore[arg-type]
+
+        (params,) = engine.executed
+        assert params["run_id"] == [run_id]
+        assert params["created_at"] == [created_at.isoformat()]
+        assert "5 times" in params["error"]
+
+    def test_nothing_to_mark(self) -> None:
+        engine = FakeEngine()
+        asyncio.run(dead_letter_runs(engine, [Delivery("1-0", {})], 5))  # type: ignore[arg-type]
+        assert engine.executed == []
+
+
+class TestPruneConsumers:
+    def test_drops_only_idle_consumers_without_pending_entries(self) -> None:
+        client = FakeRedis()
+        client.consumers = [
+            {"name": b"me", "pending": 0, "idle": 10_000},
+            {"name": b"old", "pending": 0, "idle": 10_000},
+            {"name": b"busy", "pending": 2, "idle": 10_000},
+            {"name": b"recent", "pending": 0, "idle": 10},
+        ]
+
+        asyncio.run(make_consumer(client).prune_consumers(idle_ms=1000))
+
+        assert client.deleted_consumers == ["old"]
+
+
+class TestStrandedRuns:
+    def test_oldest_undelivered_entry(self) -> None:
+        client = FakeRedis()
+        client.groups = [{"name": b"workers", "last-delivered-id": b"2000-0"}]
+        client.entries = [b"1000-0", b"2000-0", b"3500-0"]
+        consumer = make_consumer(client)
+        assert asyncio.run(consumer.undelivered_since()) == 3.5
+
+        client.entries = [b"1000-0", b"2000-0"]
+        assert asyncio.run(consumer.undelivered_since()) is None
+
+    def test_cutoff_stays_behind_backlog_and_claim_idle_time(self) -> None:
+        # Empty backlog: only the claim idle time and the grace hold runs back.
+        assert stranded_before(1000.0, None, claim_idle_seconds=300, grace_seconds=60) == 640.0
+        # A backlog older than that moves the cutoff further back.
+        assert stranded_before(1000.0, 400.0, claim_idle_seconds=300, grace_seconds=60) == 340.0
+        assert stranded_before(1000.0, 900.0, claim_idle_seconds=300, grace_seconds=60) == 640.0
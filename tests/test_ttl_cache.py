@@ -0,0 +1,51 @@
+"""Tests for the API's trigger resolution cache."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services" / "api"))
+
+from app.services.cache import MISSING, TTLCache
+from tests.fakes import FakeClock
+
+
+class TestTTLCache:
+    def test_get_missing_key(self) -> None:
+        cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl_seconds=60, negative_ttl_seconds=5)
+        assert cache.get("a") is MISSING
+
+    def test_entry_expires_after_ttl(self, clock: FakeClock) -> None:
+        cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl_seconds=60, negative_ttl_seconds=5, clock=clock)
+        cache.set("a", 1)
+        clock.now = 59
+        assert cache.get("a") == 1
+        clock.now = 60
+        assert cache.get("a") is MISSING
+        assert len(cache) == 0
+
+    def test_negative_entry_uses_negative_ttl(self, clock: FakeClock) -> None:
+        cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl_seconds=60, negative_ttl_seconds=5, clock=clock)
+        cache.set("unknown", None)
+        assert cache.get("unknown") is None
+        clock.now = 5
+        assert cache.get("unknown") is MISSING
+
+    def test_evicts_least_recently_used(self) -> None:
+        cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl_seconds=60, negative_ttl_seconds=5)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("a") == 1
+        assert cache.get("b") is MISSING
+        assert cache.get("c") == 3
+
+    def test_invalidate_and_clear(self) -> None:
+        cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl_seconds=60, negative_ttl_seconds=5)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.invalidate("a")
+        assert cache.get("a") is MISSING
+        cache.clear()
+        assert len(cache) == 0